@@ -9,14 +9,8 @@ import os
 # <-- Importe CSRFProtect para proteção CSRF
 from flask_wtf.csrf import CSRFProtect
 
-# Importar as funções de carregamento de dados no nível superior do módulo
-from .data_loader import (
-    load_all_character_data,
-    load_all_artifacts_data,
-    load_all_weapons_data
-)
-# <-- Esta função está em services/team_suggester
-from .services.team_suggester import load_defined_compositions
+# Importar a função de carregamento de dados no nível superior do módulo
+from .data_loader import load_all_game_data
 
 
 # Crie os objetos das extensões fora da função para que possam ser importados
@@ -38,6 +32,10 @@ def create_app(enable_csrf=True):
 
     app.config['WTF_CSRF_ENABLED'] = True
 
+    # Armazenamento do roster: 'rows' (tabela OwnedCharacter) ou 'packed' (coluna
+    # User.owned_characters_packed). Trocar de modo exige migrate_roster_storage.py.
+    app.config['ROSTER_STORAGE'] = os.getenv('ROSTER_STORAGE', 'rows')
+
     login_manager.session_protection = "strong"
     login_manager.login_view = 'api.login'  # type: ignore
 
@@ -57,18 +55,17 @@ def create_app(enable_csrf=True):
     CORS(app,
          resources={r"/*": {"origins": "http://localhost:3000"}},
          supports_credentials=True,
-         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-         allow_headers=["Content-Type", "Authorization", "X-CSRFToken"]
+         methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+         allow_headers=["Content-Type", "Authorization", "X-CSRFToken"],
+         expose_headers=["X-Total-Count"]
          )
 
     # Talisman(app, force_https=False if app.debug else True, content_security_policy=None)
 
     with app.app_context():
         print("INFO: Iniciando carregamento de dados da aplicação...")
-        load_all_character_data()
-        load_all_artifacts_data()
-        load_all_weapons_data()
-        load_defined_compositions()  # Chamada correta aqui
+        # Lê todos os arquivos de dados uma única vez, em paralelo
+        load_all_game_data()
         print("INFO: Carregamento de dados da aplicação concluído.")
 
         from .models import User
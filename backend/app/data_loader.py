@@ -1,6 +1,26 @@
 # backend/app/data_loader.py
+import bisect
+import gzip
+import hashlib
 import json
 import os
+import pickle
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, FrozenSet, Optional
+
+try:
+    import brotli
+except ImportError:  # Brotli é opcional: sem ele, só as variantes identity e gzip são servidas
+    brotli = None
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele, os arquivos são decodificados com json
+    orjson = None
 
 # --- Caminhos ---
 BASE_APP_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -9,174 +29,809 @@ CHARACTER_DEFINITIONS_PATH = os.path.join(
 GAME_DATA_PATH = os.path.join(BASE_APP_DIR, 'game_data')
 # Caminho para a pasta team_data, assumindo que está em services/
 TEAM_DATA_PATH = os.path.join(BASE_APP_DIR, 'services', 'team_data')
+ARTIFACTS_DATABASE_PATH = os.path.join(GAME_DATA_PATH, 'artifacts_database.json')
+WEAPONS_DATABASE_PATH = os.path.join(GAME_DATA_PATH, 'weapons_database.json')
 
+# Threads usadas para ler e decodificar os arquivos JSON no carregamento
+GAME_DATA_LOADER_THREADS = int(os.getenv('GAME_DATA_LOADER_THREADS', '8'))
+# Compacta os dados carregados (strings internadas, sub-objetos iguais compartilhados)
+GAME_DATA_COMPACT = os.getenv('GAME_DATA_COMPACT', '1') != '0'
 
-# --- Dados dos Personagens ---
-ALL_CHARACTERS_MAP = {}
-ALL_CHARACTERS_LIST = []
 
-# --- Dados dos Artefatos ---
-ALL_ARTIFACTS_MAP = {}
-ALL_ARTIFACTS_LIST = []
+# --- Leitura de arquivos JSON ---
+@dataclass(frozen=True)
+class JsonFile:
+    """
+    Resultado da leitura de um arquivo JSON: 'data' quando decodificado com
+    sucesso, ou 'error' com a exceção. mtime_ns é lido antes do conteúdo.
+    """
+    path: str
+    mtime_ns: Optional[int]
+    data: Any
+    error: Optional[Exception]
+
+
+def _json_loads(raw_bytes):
+    if orjson is not None:
+        return orjson.loads(raw_bytes)
+    return json.loads(raw_bytes.decode('utf-8'))
+
+
+def read_json_file(path):
+    mtime_ns = None
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+        with open(path, 'rb') as f:
+            raw_bytes = f.read()
+        return JsonFile(path, mtime_ns, _json_loads(raw_bytes), None)
+    except Exception as e:
+        return JsonFile(path, mtime_ns, None, e)
+
 
-# --- Dados das Armas ---
-ALL_WEAPONS_MAP = {}
-ALL_WEAPONS_LIST = []
+def list_json_files(directory):
+    return [os.path.join(directory, filename) for filename in sorted(os.listdir(directory))
+            if filename.endswith(".json")]
 
 
-def load_all_character_data():
-    global ALL_CHARACTERS_MAP, ALL_CHARACTERS_LIST
+def read_json_files(paths):
+    """Lê e decodifica os arquivos em paralelo, preservando a ordem de 'paths'."""
+    if len(paths) <= 1:
+        return [read_json_file(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=GAME_DATA_LOADER_THREADS) as executor:
+        return list(executor.map(read_json_file, paths))
+
+
+# --- Compactação dos dados carregados ---
+def _compacted_identity(value):
+    # Filhos já compactados: strings e containers iguais já são o mesmo objeto
+    if isinstance(value, (str, dict, list)):
+        return id(value)
+    return (type(value), value)
+
+
+def _compact_json_value(value, shared_containers):
+    """
+    Compacta 'value' no lugar: strings são internadas e cada dict/list igual
+    (mesmo conteúdo, mesma ordem de chaves) é trocado por uma única instância
+    registrada em shared_containers. Retorna a instância a ser usada no lugar de
+    'value'. A serialização continua idêntica.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        # Atualiza valores de chaves existentes: seguro durante a iteração
+        for key, item in value.items():
+            value[key] = _compact_json_value(item, shared_containers)
+        identity = (dict,) + tuple((key, _compacted_identity(item))
+                                   for key, item in value.items())
+    elif isinstance(value, list):
+        for pos, item in enumerate(value):
+            value[pos] = _compact_json_value(item, shared_containers)
+        identity = (list,) + tuple(_compacted_identity(item)
+                                   for item in value)
+    else:
+        return value
+    return shared_containers.setdefault(identity, value)
+
+
+def compact_json_files(json_files):
+    """
+    Compacta os dados de vários arquivos em conjunto: builds repetidas, nomes e
+    URLs de ícones de armas/artefatos etc. passam a ser compartilhados entre
+    personagens (e, pelas strings internadas, com os registros de artefatos e
+    armas). Os objetos resultantes são somente
+    leitura: alterar um deles alteraria todos os lugares que o compartilham.
+    """
+    shared_containers = {}
+    return [replace(json_file, data=_compact_json_value(json_file.data, shared_containers))
+            if json_file.error is None else json_file
+            for json_file in json_files]
+
+
+# --- Estado dos dados do jogo ---
+# Campos da projeção enxuta usada pela grade de personagens do frontend
+CHARACTER_SLIM_FIELDS = ('id', 'name', 'element', 'rarity', 'icon_url')
+
+
+@dataclass(frozen=True)
+class SortedCharacters:
+    """
+    Personagens ordenados por ID (ordem estável para paginação), seus IDs e suas
+    projeções enxutas.
+    """
+    ids: list
+    records: list
+    slim_records: list
+
+
+@dataclass(frozen=True)
+class CatalogPayload:
+    """
+    Corpo JSON de um catálogo serializado uma única vez no carregamento, com as
+    variantes comprimidas e um ETag forte (hash do corpo, sem aspas).
+    """
+    body: bytes
+    gzip_body: bytes
+    brotli_body: Optional[bytes]
+    etag: str
+
+
+@dataclass(frozen=True)
+class GameData:
+    """
+    Todos os dados do jogo carregados e os índices derivados deles, montados por
+    completo antes de serem publicados em GAME_DATA com uma única atribuição: uma
+    recarga nunca expõe personagens de um carregamento com índices ou times de
+    outro. Quem precisa de mais de um campo deve ler GAME_DATA uma única vez
+    (get_game_data()) e usar só esse objeto. Nada aqui deve ser modificado.
+    """
+    characters_map: Dict[str, dict] = field(default_factory=dict)
+    characters_list: list = field(default_factory=list)
+    # Índice das builds de cada personagem por 'key': {character_id: {build_key: build}}
+    builds_by_key: Dict[str, dict] = field(default_factory=dict)
+    # Índice compacto de cada personagem (posição do bit nas máscaras de roster), por ordem de ID
+    bit_index: Dict[str, int] = field(default_factory=dict)
+    sorted_characters: SortedCharacters = SortedCharacters([], [], [])
+    # Campos de primeiro nível presentes em alguma definição de personagem
+    character_fields: FrozenSet[str] = frozenset()
+    artifacts_map: Dict[str, dict] = field(default_factory=dict)
+    artifacts_list: list = field(default_factory=list)
+    weapons_map: Dict[str, dict] = field(default_factory=dict)
+    weapons_list: list = field(default_factory=list)
+    # Respostas pré-serializadas dos catálogos estáticos: nome do catálogo
+    # ('characters', 'characters_slim', 'artifacts', 'weapons') -> CatalogPayload
+    catalog_payloads: Dict[str, CatalogPayload] = field(default_factory=dict)
+    # Composições de times compiladas (team_suggester.TeamMatchIndex) sobre estes personagens
+    team_match_index: Any = None
+    # Incrementada a cada publicação; caches derivados destes dados a incluem nas suas chaves
+    version: int = 0
+
+
+GAME_DATA = GameData()
+
+# Qualidade 11 comprime ~7% melhor, mas custa segundos a cada boot de worker
+CATALOG_BROTLI_QUALITY = 9
+
+# Payloads já comprimidos vindos do snapshot binário, por ETag do corpo
+_PREBUILT_CATALOG_PAYLOADS = {}
+
+
+def build_catalog_payload(data):
+    body = json.dumps(data, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    prebuilt_payload = _PREBUILT_CATALOG_PAYLOADS.get(etag)
+    if prebuilt_payload is not None and prebuilt_payload.body == body:
+        return prebuilt_payload
+    return CatalogPayload(
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+        brotli_body=brotli.compress(
+            body, quality=CATALOG_BROTLI_QUALITY) if brotli is not None else None,
+        etag=etag)
+
+
+def get_game_data():
+    return GAME_DATA
+
+
+def _apply_game_data_changes(game_data, changes):
+    """
+    Novo GameData com 'changes' (campos de GameData, como os retornados pelos
+    build_*_data) aplicadas; os catálogos de 'changes' são mesclados aos atuais.
+    """
+    changes = dict(changes)
+    catalog_payloads = dict(game_data.catalog_payloads)
+    catalog_payloads.update(changes.pop('catalog_payloads', {}))
+    return replace(game_data, **changes, catalog_payloads=catalog_payloads)
+
+
+def _publish_game_data(game_data):
+    # Chamada com GAME_DATA_RELOAD_LOCK: a única atribuição de GAME_DATA
+    global GAME_DATA
+    GAME_DATA = replace(game_data, version=GAME_DATA.version + 1)
+    return GAME_DATA
+
+
+def replace_game_data(**changes):
+    """
+    Publica um novo GameData com 'changes' aplicadas sobre o atual, para quem
+    recompila parte dos dados fora de um carregamento completo.
+    """
+    with GAME_DATA_RELOAD_LOCK:
+        return _publish_game_data(_apply_game_data_changes(GAME_DATA, changes))
+
+
+def _index_characters(loaded_chars_map, loaded_chars_list):
+    sorted_chars_list = sorted(
+        loaded_chars_list, key=lambda char_data: char_data['id'])
+    sorted_characters = SortedCharacters(
+        ids=[char_data['id'] for char_data in sorted_chars_list],
+        records=sorted_chars_list,
+        slim_records=[project_character(char_data, CHARACTER_SLIM_FIELDS)
+                      for char_data in sorted_chars_list])
+    return {
+        "characters_map": loaded_chars_map,
+        "characters_list": loaded_chars_list,
+        "builds_by_key": _index_builds_by_key(loaded_chars_map),
+        "bit_index": {char_id: bit for bit, char_id in enumerate(sorted_characters.ids)},
+        "sorted_characters": sorted_characters,
+        "character_fields": frozenset(
+            field_name for char_data in loaded_chars_list for field_name in char_data),
+        "catalog_payloads": {
+            'characters': build_catalog_payload(loaded_chars_list),
+            'characters_slim': build_catalog_payload(sorted_characters.slim_records),
+        },
+    }
+
+
+def build_character_data(json_files=None):
+    """
+    Lê as definições de personagens e monta os índices derivados. Retorna os
+    campos de GameData correspondentes, sem publicá-los.
+    """
     loaded_chars_map = {}
     loaded_chars_list = []
     if not os.path.exists(CHARACTER_DEFINITIONS_PATH):
         print(
             f"AVISO CRÍTICO: O diretório de definições de personagens não foi encontrado: {CHARACTER_DEFINITIONS_PATH}")
-        ALL_CHARACTERS_MAP, ALL_CHARACTERS_LIST = {}, []
-        return
+        return _index_characters(loaded_chars_map, loaded_chars_list)
     print(
         f"INFO: Carregando definições de personagens de: {CHARACTER_DEFINITIONS_PATH}")
-    found_files = False
-    for filename in os.listdir(CHARACTER_DEFINITIONS_PATH):
-        if filename.endswith(".json"):
-            found_files = True
-            filepath = os.path.join(CHARACTER_DEFINITIONS_PATH, filename)
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    char_data = json.load(f)
-                    if isinstance(char_data, dict) and 'id' in char_data:
-                        loaded_chars_map[char_data['id']] = char_data
-                        loaded_chars_list.append(char_data)
-                    else:
-                        print(
-                            f"AVISO: Arquivo JSON {filename} em character_definitions/ não contém um objeto de personagem válido com 'id'.")
-            except Exception as e:
-                print(
-                    f"ERRO ao carregar dados do personagem de {filename}: {str(e)}")
-    ALL_CHARACTERS_MAP, ALL_CHARACTERS_LIST = loaded_chars_map, loaded_chars_list
-    if found_files and ALL_CHARACTERS_LIST:
+    if json_files is None:
+        json_files = read_json_files(
+            list_json_files(CHARACTER_DEFINITIONS_PATH))
+    found_files = bool(json_files)
+    for json_file in json_files:
+        filename = os.path.basename(json_file.path)
+        if json_file.error is not None:
+            print(
+                f"ERRO ao carregar dados do personagem de {filename}: {str(json_file.error)}")
+            continue
+        char_data = json_file.data
+        if isinstance(char_data, dict) and 'id' in char_data:
+            loaded_chars_map[char_data['id']] = char_data
+            loaded_chars_list.append(char_data)
+        else:
+            print(
+                f"AVISO: Arquivo JSON {filename} em character_definitions/ não contém um objeto de personagem válido com 'id'.")
+
+    if found_files and loaded_chars_list:
         print(
-            f"INFO: Total de {len(ALL_CHARACTERS_LIST)} definições de personagens carregadas.")
+            f"INFO: Total de {len(loaded_chars_list)} definições de personagens carregadas.")
     elif found_files:
         print(
             f"AVISO: Arquivos JSON de personagem encontrados em {CHARACTER_DEFINITIONS_PATH}, mas nenhum dado válido foi carregado.")
     else:
         print(
             f"AVISO: Nenhum arquivo .json de personagem encontrado em {CHARACTER_DEFINITIONS_PATH}.")
+    return _index_characters(loaded_chars_map, loaded_chars_list)
+
+
+def _index_builds_by_key(chars_map):
+    """
+    Monta {character_id: {build_key: build}} para evitar buscas lineares em
+    build_options a cada requisição. Mantém a primeira build de cada 'key'.
+    """
+    builds_index = {}
+    for char_id, char_data in chars_map.items():
+        builds_for_char = {}
+        for build in char_data.get("build_options", []) or []:
+            if isinstance(build, dict) and build.get("key"):
+                builds_for_char.setdefault(build["key"], build)
+        builds_index[char_id] = builds_for_char
+    return builds_index
+
+
+def get_game_data_version():
+    return GAME_DATA.version
+
+
+def project_character(char_data, fields):
+    return {field_name: char_data[field_name] for field_name in fields if field_name in char_data}
 
 
 def get_all_characters_list():
-    return ALL_CHARACTERS_LIST
+    return GAME_DATA.characters_list
+
+
+def get_character_fields():
+    return GAME_DATA.character_fields
+
+
+def get_characters_page(fields=None, cursor=None, limit=None):
+    """
+    Retorna (personagens, próximo cursor) em ordem de ID, projetados em 'fields'
+    (todos os campos se None). 'cursor' é o ID do último personagem da página
+    anterior; o próximo cursor é None na última página. Projeções contidas em
+    CHARACTER_SLIM_FIELDS partem dos registros enxutos pré-computados.
+    """
+    sorted_characters = GAME_DATA.sorted_characters
+    if fields is None:
+        source_records, needs_projection = sorted_characters.records, False
+    elif set(fields) <= set(CHARACTER_SLIM_FIELDS):
+        source_records = sorted_characters.slim_records
+        needs_projection = tuple(fields) != CHARACTER_SLIM_FIELDS
+    else:
+        source_records, needs_projection = sorted_characters.records, True
+
+    start = bisect.bisect_right(
+        sorted_characters.ids, cursor) if cursor else 0
+    end = len(source_records) if limit is None else min(
+        start + limit, len(source_records))
+    page_records = source_records[start:end]
+    if needs_projection:
+        page_records = [project_character(char_data, fields)
+                        for char_data in page_records]
+    next_cursor = sorted_characters.ids[end - 1] if start < end < len(
+        source_records) else None
+    return page_records, next_cursor
 
 
 def get_all_characters_map():
-    return ALL_CHARACTERS_MAP
+    return GAME_DATA.characters_map
+
+
+def get_character_bit_index():
+    return GAME_DATA.bit_index
 
 
-def load_all_artifacts_data():
-    global ALL_ARTIFACTS_MAP, ALL_ARTIFACTS_LIST
+def get_catalog_payload(catalog_name):
+    return GAME_DATA.catalog_payloads.get(catalog_name)
+
+
+def build_roster_mask(character_ids, bit_index=None):
+    """
+    Converte uma coleção de IDs de personagens em uma máscara de bits sobre
+    bit_index (o de GAME_DATA por padrão). IDs desconhecidos são ignorados.
+    """
+    if bit_index is None:
+        bit_index = GAME_DATA.bit_index
+    mask = 0
+    for char_id in character_ids:
+        bit = bit_index.get(char_id)
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+
+def get_character_build(character_id, build_key, game_data=None):
+    """
+    Retorna a build 'build_key' do personagem, ou a primeira build disponível
+    quando a chave não existe ou não foi informada. Retorna None se o personagem
+    não tiver build_options. 'game_data' é GAME_DATA por padrão.
+    """
+    game_data = game_data or GAME_DATA
+    char_data = game_data.characters_map.get(character_id)
+    if not char_data:
+        return None
+    if build_key:
+        build = game_data.builds_by_key.get(character_id, {}).get(build_key)
+        if build is not None:
+            return build
+    build_options = char_data.get("build_options") or []
+    return build_options[0] if build_options else None
+
+
+def build_artifacts_data(json_file=None):
+    """Lê artifacts_database.json e retorna os campos de GameData correspondentes."""
     loaded_artifacts_map = {}
     loaded_artifacts_list = []
-    artifacts_file_path = os.path.join(
-        GAME_DATA_PATH, 'artifacts_database.json')
+    artifacts_file_path = ARTIFACTS_DATABASE_PATH
 
     if not os.path.exists(artifacts_file_path):
         print(
             f"AVISO CRÍTICO: Arquivo artifacts_database.json não encontrado em: {artifacts_file_path}")
-        ALL_ARTIFACTS_MAP, ALL_ARTIFACTS_LIST = {}, []
-        return
-
-    print(
-        f"INFO: Carregando banco de dados de artefatos de: {artifacts_file_path}")
-    try:
-        with open(artifacts_file_path, 'r', encoding='utf-8') as f:
-            artifacts_data = json.load(f)
-            if isinstance(artifacts_data, list):
-                for artifact_set in artifacts_data:
-                    if isinstance(artifact_set, dict) and 'id' in artifact_set:
-                        loaded_artifacts_map[artifact_set['id']] = artifact_set
-                        loaded_artifacts_list.append(artifact_set)
-                    else:
-                        print(
-                            f"AVISO: Item inválido encontrado em artifacts_database.json (sem 'id' ou não é um dicionário).")
-            else:
-                print(
-                    f"AVISO: artifacts_database.json não contém uma lista de artefatos no formato esperado.")
-    except Exception as e:
-        print(f"ERRO ao carregar artifacts_database.json: {str(e)}")
-
-    ALL_ARTIFACTS_MAP, ALL_ARTIFACTS_LIST = loaded_artifacts_map, loaded_artifacts_list
-    if ALL_ARTIFACTS_LIST:
-        print(
-            f"INFO: Total de {len(ALL_ARTIFACTS_LIST)} conjuntos de artefatos carregados.")
     else:
-        print("AVISO: Nenhum conjunto de artefatos válido foi carregado.")
+        print(
+            f"INFO: Carregando banco de dados de artefatos de: {artifacts_file_path}")
+        if json_file is None:
+            json_file = read_json_file(artifacts_file_path)
+        if json_file.error is not None:
+            print(f"ERRO ao carregar artifacts_database.json: {str(json_file.error)}")
+        elif isinstance(json_file.data, list):
+            for artifact_set in json_file.data:
+                if isinstance(artifact_set, dict) and 'id' in artifact_set:
+                    loaded_artifacts_map[artifact_set['id']] = artifact_set
+                    loaded_artifacts_list.append(artifact_set)
+                else:
+                    print(
+                        f"AVISO: Item inválido encontrado em artifacts_database.json (sem 'id' ou não é um dicionário).")
+        else:
+            print(
+                f"AVISO: artifacts_database.json não contém uma lista de artefatos no formato esperado.")
+
+        if loaded_artifacts_list:
+            print(
+                f"INFO: Total de {len(loaded_artifacts_list)} conjuntos de artefatos carregados.")
+        else:
+            print("AVISO: Nenhum conjunto de artefatos válido foi carregado.")
+    return {
+        "artifacts_map": loaded_artifacts_map,
+        "artifacts_list": loaded_artifacts_list,
+        "catalog_payloads": {'artifacts': build_catalog_payload(loaded_artifacts_list)},
+    }
 
 
 def get_all_artifacts_list():
-    return ALL_ARTIFACTS_LIST
+    return GAME_DATA.artifacts_list
 
 
 def get_artifact_by_id(artifact_id):
-    return ALL_ARTIFACTS_MAP.get(artifact_id)
+    return GAME_DATA.artifacts_map.get(artifact_id)
 
 
-def load_all_weapons_data():
-    global ALL_WEAPONS_MAP, ALL_WEAPONS_LIST
+def build_weapons_data(json_file=None):
+    """Lê weapons_database.json e retorna os campos de GameData correspondentes."""
     loaded_weapons_map = {}
     loaded_weapons_list = []
-    weapons_file_path = os.path.join(GAME_DATA_PATH, 'weapons_database.json')
+    weapons_file_path = WEAPONS_DATABASE_PATH
 
     if not os.path.exists(weapons_file_path):
         print(
             f"AVISO CRÍTICO: Arquivo weapons_database.json não encontrado em: {weapons_file_path}")
-        ALL_WEAPONS_MAP, ALL_WEAPONS_LIST = {}, []
-        return
+    else:
+        print(f"INFO: Carregando banco de dados de armas de: {weapons_file_path}")
+        if json_file is None:
+            json_file = read_json_file(weapons_file_path)
+        if json_file.error is not None:
+            print(f"ERRO ao carregar weapons_database.json: {str(json_file.error)}")
+        elif isinstance(json_file.data, list):
+            for weapon in json_file.data:
+                if isinstance(weapon, dict) and 'id' in weapon:
+                    loaded_weapons_map[weapon['id']] = weapon
+                    loaded_weapons_list.append(weapon)
+                else:
+                    print(
+                        f"AVISO: Item inválido encontrado em weapons_database.json (sem 'id' ou não é um dicionário).")
+        else:
+            print(
+                f"AVISO: weapons_database.json não contém uma lista de armas no formato esperado.")
+
+        if loaded_weapons_list:
+            print(f"INFO: Total de {len(loaded_weapons_list)} armas carregadas.")
+        else:
+            print("AVISO: Nenhuma arma válida foi carregada de weapons_database.json.")
+    return {
+        "weapons_map": loaded_weapons_map,
+        "weapons_list": loaded_weapons_list,
+        "catalog_payloads": {'weapons': build_catalog_payload(loaded_weapons_list)},
+    }
+
+
+def get_all_weapons_list():
+    return GAME_DATA.weapons_list
+
+
+def get_weapon_by_id(weapon_id):
+    return GAME_DATA.weapons_map.get(weapon_id)
+
+# --- CARREGAMENTO UNIFICADO DE TODOS OS DADOS DO JOGO ---
+
+# Snapshot binário (pickle) com todos os arquivos de dados já decodificados e os
+# catálogos já comprimidos. Gerado por build_data_snapshot.py.
+GAME_DATA_SNAPSHOT_PATH = os.getenv(
+    'GAME_DATA_SNAPSHOT_PATH', os.path.join(BASE_APP_DIR, 'game_data_snapshot.pickle'))
+# 'auto': usa o snapshot quando ele corresponde aos arquivos atuais; 'off': sempre lê os JSON
+GAME_DATA_SNAPSHOT_MODE = os.getenv('GAME_DATA_SNAPSHOT', 'auto')
+# Incrementar sempre que o conteúdo do snapshot mudar de formato
+GAME_DATA_SNAPSHOT_FORMAT_VERSION = 2
+
+# Arquivos de dados atualmente carregados (caminho -> JsonFile), base da recarga incremental
+LOADED_GAME_DATA_FILES = {}
+# Arquivos cuja última releitura falhou (caminho -> mtime_ns lido): a versão boa
+# anterior continua em LOADED_GAME_DATA_FILES e o arquivo só é relido quando
+# mudar de novo
+_FAILED_GAME_DATA_FILES = {}
+# Serializa carregamentos e recargas (watcher e rota de admin)
+GAME_DATA_RELOAD_LOCK = threading.Lock()
+# Intervalo (s) entre as verificações de arquivos alterados; 0 desativa o watcher
+GAME_DATA_WATCH_INTERVAL = float(os.getenv('GAME_DATA_WATCH_INTERVAL', '5'))
+# PID do processo em que o watcher foi iniciado (threads não sobrevivem ao fork)
+_GAME_DATA_WATCHER_PID = None
+
+
+def _list_game_data_paths():
+    """
+    Retorna (arquivos de personagens, arquivos de times, bancos de dados); as
+    listas de diretórios inexistentes são None.
+    """
+    character_paths = list_json_files(CHARACTER_DEFINITIONS_PATH) if os.path.isdir(
+        CHARACTER_DEFINITIONS_PATH) else None
+    team_paths = list_json_files(TEAM_DATA_PATH) if os.path.isdir(
+        TEAM_DATA_PATH) else None
+    database_paths = [path for path in (ARTIFACTS_DATABASE_PATH, WEAPONS_DATABASE_PATH)
+                      if os.path.exists(path)]
+    return character_paths, team_paths, database_paths
+
 
-    print(f"INFO: Carregando banco de dados de armas de: {weapons_file_path}")
+def _read_game_data_snapshot(all_paths):
+    """
+    Retorna ({caminho: JsonFile}, dados já compactados?) a partir do snapshot, ou
+    None se ele não existir, for de outra versão ou não corresponder exatamente
+    (mesmos arquivos, mesmos mtimes) aos arquivos de origem atuais.
+    """
+    if GAME_DATA_SNAPSHOT_MODE == 'off':
+        return None
+    if not os.path.exists(GAME_DATA_SNAPSHOT_PATH):
+        print(
+            f"AVISO: Snapshot de dados não encontrado em {GAME_DATA_SNAPSHOT_PATH} (gere com build_data_snapshot.py). Lendo os arquivos JSON.")
+        return None
     try:
-        with open(weapons_file_path, 'r', encoding='utf-8') as f:
-            weapons_data = json.load(f)
-            if isinstance(weapons_data, list):
-                for weapon in weapons_data:
-                    if isinstance(weapon, dict) and 'id' in weapon:
-                        loaded_weapons_map[weapon['id']] = weapon
-                        loaded_weapons_list.append(weapon)
-                    else:
-                        print(
-                            f"AVISO: Item inválido encontrado em weapons_database.json (sem 'id' ou não é um dicionário).")
-            else:
-                print(
-                    f"AVISO: weapons_database.json não contém uma lista de armas no formato esperado.")
+        with open(GAME_DATA_SNAPSHOT_PATH, 'rb') as f:
+            snapshot = pickle.load(f)
+        if snapshot.get("format_version") != GAME_DATA_SNAPSHOT_FORMAT_VERSION:
+            print(
+                f"AVISO: Snapshot de dados em {GAME_DATA_SNAPSHOT_PATH} é de outra versão. Lendo os arquivos JSON.")
+            return None
+        snapshot_files = snapshot["files"]
+        current_mtimes = {os.path.relpath(path, BASE_APP_DIR): os.stat(path).st_mtime_ns
+                          for path in all_paths}
+        if current_mtimes != {rel_path: mtime_ns for rel_path, (mtime_ns, _) in snapshot_files.items()}:
+            print(
+                f"AVISO: Snapshot de dados em {GAME_DATA_SNAPSHOT_PATH} está desatualizado. Lendo os arquivos JSON.")
+            return None
     except Exception as e:
-        print(f"ERRO ao carregar weapons_database.json: {str(e)}")
+        print(
+            f"ERRO ao ler o snapshot de dados {GAME_DATA_SNAPSHOT_PATH}: {str(e)}. Lendo os arquivos JSON.")
+        return None
 
-    ALL_WEAPONS_MAP, ALL_WEAPONS_LIST = loaded_weapons_map, loaded_weapons_list
-    if ALL_WEAPONS_LIST:
-        print(f"INFO: Total de {len(ALL_WEAPONS_LIST)} armas carregadas.")
+    _PREBUILT_CATALOG_PAYLOADS.update(
+        (payload.etag, payload) for payload in snapshot.get("catalog_payloads", []))
+    json_files_by_path = {path: JsonFile(path, *snapshot_files[os.path.relpath(path, BASE_APP_DIR)], None)
+                          for path in all_paths}
+    return json_files_by_path, snapshot.get("compacted", False)
+
+
+def load_all_game_data(use_snapshot=True):
+    """
+    Carrega personagens, artefatos, armas e composições de times lendo todos os
+    arquivos de dados uma única vez: do snapshot binário, quando ele está em dia
+    com os arquivos de origem, ou dos JSON em paralelo. Imprime e retorna o tempo
+    (ms) de cada fase.
+    """
+    with GAME_DATA_RELOAD_LOCK:
+        return _load_all_game_data(use_snapshot)
+
+
+def _load_all_game_data(use_snapshot):
+    global LOADED_GAME_DATA_FILES
+    # Import local: team_suggester importa este módulo
+    from .services import team_suggester
+
+    timings = {}
+    phase_started = time.perf_counter()
+
+    def finish_phase(phase_name):
+        nonlocal phase_started
+        now = time.perf_counter()
+        timings[phase_name] = round((now - phase_started) * 1000, 1)
+        phase_started = now
+
+    character_paths, team_paths, database_paths = _list_game_data_paths()
+    all_paths = (character_paths or []) + (team_paths or []) + database_paths
+    snapshot_data = _read_game_data_snapshot(
+        all_paths) if use_snapshot else None
+    if snapshot_data is not None:
+        data_source = "snapshot"
+        json_files_by_path, already_compacted = snapshot_data
     else:
-        print("AVISO: Nenhuma arma válida foi carregada de weapons_database.json.")
+        data_source = "json"
+        json_files_by_path = dict(zip(all_paths, read_json_files(all_paths)))
+        already_compacted = False
+    finish_phase("leitura")
+    # O pickle preserva o compartilhamento: um snapshot compactado não precisa de nova passada
+    if GAME_DATA_COMPACT and not already_compacted:
+        json_files_by_path = dict(
+            zip(json_files_by_path, compact_json_files(json_files_by_path.values())))
+        finish_phase("compactacao")
+
+    # Nada é publicado antes de o novo GameData estar completo
+    game_data = _apply_game_data_changes(GameData(), build_character_data(
+        [json_files_by_path[path] for path in character_paths] if character_paths is not None else None))
+    finish_phase("personagens")
+    game_data = _apply_game_data_changes(game_data, build_artifacts_data(
+        json_files_by_path.get(ARTIFACTS_DATABASE_PATH)))
+    finish_phase("artefatos")
+    game_data = _apply_game_data_changes(game_data, build_weapons_data(
+        json_files_by_path.get(WEAPONS_DATABASE_PATH)))
+    finish_phase("armas")
+    game_data = replace(game_data, team_match_index=team_suggester.build_team_match_index(
+        [json_files_by_path[path] for path in team_paths] if team_paths is not None else None, game_data))
+    finish_phase("composicoes")
+    _publish_game_data(game_data)
+    LOADED_GAME_DATA_FILES = json_files_by_path
+    _FAILED_GAME_DATA_FILES.clear()
+    # Os payloads do snapshot só servem para este carregamento
+    _PREBUILT_CATALOG_PAYLOADS.clear()
+
+    timings["total"] = round(sum(timings.values()), 1)
+    print("INFO: Tempos de carregamento (ms): " +
+          ", ".join(f"{phase}={elapsed}" for phase, elapsed in timings.items()) +
+          f" [{len(all_paths)} arquivos, fonte {data_source}, {GAME_DATA_LOADER_THREADS} threads, parser {'orjson' if orjson else 'json'}]")
+    return timings
+
+
+def _file_mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
 
 
-def get_all_weapons_list():
-    return ALL_WEAPONS_LIST
+def reload_changed_game_data():
+    """
+    Relê apenas os arquivos de dados criados, alterados ou removidos desde o
+    último carregamento e recarrega os conjuntos afetados (composições também
+    quando os personagens mudam). O novo GameData é montado por completo e
+    publicado de uma vez, então uma requisição concorrente vê sempre ou o estado
+    anterior ou o novo. Um arquivo que não pode ser lido (p.ex. salvo pela metade)
+    mantém a última versão boa até a próxima alteração. Retorna um resumo da
+    recarga, ou None se nada mudou.
+    """
+    global LOADED_GAME_DATA_FILES
+    from .services import team_suggester
+
+    with GAME_DATA_RELOAD_LOCK:
+        started = time.perf_counter()
+        character_paths, team_paths, database_paths = _list_game_data_paths()
+        all_paths = (character_paths or []) + \
+            (team_paths or []) + database_paths
+        loaded_files = LOADED_GAME_DATA_FILES
+        changed_paths = []
+        for path in all_paths:
+            loaded_file = loaded_files.get(path)
+            current_mtime = _file_mtime_ns(path)
+            if current_mtime is not None and _FAILED_GAME_DATA_FILES.get(path) == current_mtime:
+                continue
+            if loaded_file is None or current_mtime is None or loaded_file.mtime_ns != current_mtime:
+                changed_paths.append(path)
+        listed_paths = set(all_paths)
+        removed_paths = [path for path in loaded_files if path not in listed_paths]
+        if not changed_paths and not removed_paths:
+            return None
+
+        json_files_by_path = {path: loaded_files[path]
+                              for path in all_paths if path in loaded_files}
+        changed_files = read_json_files(changed_paths)
+        failed_files = [json_file for json_file in changed_files if json_file.error is not None]
+        for json_file in failed_files:
+            _FAILED_GAME_DATA_FILES[json_file.path] = json_file.mtime_ns
+            kept_version = "mantendo a versão anterior" if json_file.path in json_files_by_path else "ignorado"
+            print(
+                f"ERRO ao recarregar {os.path.relpath(json_file.path, BASE_APP_DIR)} ({kept_version} até a próxima alteração): {str(json_file.error)}")
+        changed_files = [json_file for json_file in changed_files if json_file.error is None]
+        changed_paths = [json_file.path for json_file in changed_files]
+        for path in changed_paths:
+            _FAILED_GAME_DATA_FILES.pop(path, None)
+        for path in removed_paths:
+            _FAILED_GAME_DATA_FILES.pop(path, None)
+        if not changed_paths and not removed_paths:
+            return None
+        if GAME_DATA_COMPACT:
+            changed_files = compact_json_files(changed_files)
+        json_files_by_path.update(zip(changed_paths, changed_files))
+        affected_paths = set(changed_paths) | set(removed_paths)
+        affected_dirs = {os.path.dirname(path) for path in affected_paths}
+
+        reloaded = []
+        game_data = GAME_DATA
+        if CHARACTER_DEFINITIONS_PATH in affected_dirs:
+            game_data = _apply_game_data_changes(game_data, build_character_data(
+                [json_files_by_path[path] for path in character_paths] if character_paths is not None else None))
+            reloaded.append("characters")
+        if ARTIFACTS_DATABASE_PATH in affected_paths:
+            game_data = _apply_game_data_changes(game_data, build_artifacts_data(
+                json_files_by_path.get(ARTIFACTS_DATABASE_PATH)))
+            reloaded.append("artifacts")
+        if WEAPONS_DATABASE_PATH in affected_paths:
+            game_data = _apply_game_data_changes(game_data, build_weapons_data(
+                json_files_by_path.get(WEAPONS_DATABASE_PATH)))
+            reloaded.append("weapons")
+        if TEAM_DATA_PATH in affected_dirs or "characters" in reloaded:
+            game_data = replace(game_data, team_match_index=team_suggester.build_team_match_index(
+                [json_files_by_path[path] for path in team_paths] if team_paths is not None else None, game_data))
+            reloaded.append("team_compositions")
+        _publish_game_data(game_data)
+        LOADED_GAME_DATA_FILES = json_files_by_path
+
+        summary = {
+            "changed_files": [os.path.relpath(path, BASE_APP_DIR) for path in changed_paths],
+            "removed_files": [os.path.relpath(path, BASE_APP_DIR) for path in removed_paths],
+            "reloaded": reloaded,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        print(
+            f"INFO: Dados do jogo recarregados em {summary['elapsed_ms']} ms "
+            f"({len(changed_paths)} arquivos alterados, {len(removed_paths)} removidos): {', '.join(reloaded)}.")
+        return summary
 
 
-def get_weapon_by_id(weapon_id):
-    return ALL_WEAPONS_MAP.get(weapon_id)
+def start_game_data_watcher(interval=None):
+    """
+    Inicia, uma vez por processo, a thread que a cada 'interval' segundos
+    (GAME_DATA_WATCH_INTERVAL por padrão) procura arquivos de dados alterados e
+    os recarrega. Sob o Gunicorn com preload, deve ser chamada em cada worker
+    após o fork. Retorna True se a thread foi iniciada.
+    """
+    global _GAME_DATA_WATCHER_PID
+    interval = GAME_DATA_WATCH_INTERVAL if interval is None else interval
+    if interval <= 0 or _GAME_DATA_WATCHER_PID == os.getpid():
+        return False
+
+    def watch_game_data():
+        while True:
+            time.sleep(interval)
+            try:
+                reload_changed_game_data()
+            except Exception as e:
+                print(
+                    f"ERRO na recarga automática dos dados do jogo: {str(e)}")
+
+    threading.Thread(target=watch_game_data,
+                     name="game-data-watcher", daemon=True).start()
+    _GAME_DATA_WATCHER_PID = os.getpid()
+    print(
+        f"INFO: Monitorando alterações nos dados do jogo a cada {interval} s (PID {os.getpid()}).")
+    return True
+
+
+def build_game_data_snapshot(snapshot_path=None):
+    """
+    Lê todos os arquivos de dados, carrega-os (para gerar os catálogos
+    comprimidos) e grava o snapshot binário. Retorna False, sem gravar nada, se
+    algum arquivo não puder ser lido.
+    """
+    snapshot_path = snapshot_path or GAME_DATA_SNAPSHOT_PATH
+    character_paths, team_paths, database_paths = _list_game_data_paths()
+    all_paths = (character_paths or []) + (team_paths or []) + database_paths
+    json_files = read_json_files(all_paths)
+    failed_files = [json_file for json_file in json_files if json_file.error is not None]
+    for json_file in failed_files:
+        print(
+            f"ERRO: Não foi possível ler {json_file.path} para o snapshot: {str(json_file.error)}")
+    if failed_files:
+        return False
+
+    load_all_game_data(use_snapshot=False)
+    if GAME_DATA_COMPACT:
+        json_files = compact_json_files(json_files)
+    snapshot = {
+        "format_version": GAME_DATA_SNAPSHOT_FORMAT_VERSION,
+        "compacted": GAME_DATA_COMPACT,
+        "files": {os.path.relpath(json_file.path, BASE_APP_DIR): (json_file.mtime_ns, json_file.data)
+                  for json_file in json_files},
+        "catalog_payloads": list(GAME_DATA.catalog_payloads.values()),
+    }
+    temp_path = snapshot_path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, snapshot_path)
+    print(
+        f"INFO: Snapshot de dados com {len(json_files)} arquivos gravado em {snapshot_path}.")
+    return True
+
 
 # --- FUNÇÃO PARA CARREGAR TIMES DE UM PERSONAGEM ESPECÍFICO (TEAM_DATA) ---
 
 
+def get_team_file_path(character_id):
+    """
+    Retorna (safe_character_id, caminho) do arquivo team_data/<character_id>.json,
+    com o character_id sanitizado para formar um nome de arquivo seguro.
+    """
+    safe_character_id = "".join(
+        c for c in character_id if c.isalnum() or c in ('_', '-')).lower()
+    return safe_character_id, os.path.join(TEAM_DATA_PATH, f"{safe_character_id}.json")
+
+
 def get_teams_for_character_from_file(character_id):
     """
     Carrega e retorna os templates de composição de time para um personagem específico
     do arquivo team_data/character_id.json.
     """
     team_templates = []
-    # Sanitiza o character_id para formar um nome de arquivo seguro
-    safe_character_id = "".join(
-        c for c in character_id if c.isalnum() or c in ('_', '-')).lower()
-    team_file_path = os.path.join(TEAM_DATA_PATH, f"{safe_character_id}.json")
+    safe_character_id, team_file_path = get_team_file_path(character_id)
 
     if not os.path.exists(team_file_path):
         print(
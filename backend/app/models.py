@@ -11,6 +11,8 @@ class User(db.Model, UserMixin):
     username = db.Column(db.String(20), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
     role = db.Column(db.String(10), default='user', nullable=False)
+    # Roster compactado (modo ROSTER_STORAGE='packed'): array JSON ordenado de IDs
+    owned_characters_packed = db.Column(db.Text)
 
     owned_characters_association = db.relationship(
         'OwnedCharacter', backref='owner', lazy=True, cascade="all, delete-orphan")
@@ -85,3 +87,16 @@ class TierListEntry(db.Model):
 
     def __repr__(self):
         return f"<TierListEntry {self.character_name} ({self.character_id}) - Tier: {self.tier_level} - Role: {self.role}>"
+
+
+class DataGeneration(db.Model):
+    """
+    Contador de geração de um conjunto de dados do banco (ex.: 'tierlist'),
+    incrementado na mesma transação que altera os dados. Os caches em memória de
+    cada processo comparam a geração para saber quando foram invalidados.
+    """
+    name = db.Column(db.String(50), primary_key=True)
+    generation = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DataGeneration {self.name}: {self.generation}>"
@@ -0,0 +1,173 @@
+# backend/app/roster_storage.py
+# Leitura e escrita do roster (personagens possuídos) de um usuário nos dois
+# modos de armazenamento suportados (app.config['ROSTER_STORAGE']):
+#   - 'rows': uma linha de OwnedCharacter por personagem;
+#   - 'packed': um array JSON ordenado de IDs em User.owned_characters_packed,
+#     lido junto com o próprio usuário (nenhuma consulta extra).
+import json
+
+from flask import current_app
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from . import db
+from .models import OwnedCharacter, User
+
+ROSTER_STORAGE_ROWS = 'rows'
+ROSTER_STORAGE_PACKED = 'packed'
+ROSTER_STORAGE_MODES = (ROSTER_STORAGE_ROWS, ROSTER_STORAGE_PACKED)
+# Tentativas de aplicar uma diferença do roster que colide com uma escrita
+# concorrente do mesmo usuário antes de desistir
+ROSTER_UPDATE_MAX_ATTEMPTS = 5
+
+
+class RosterUpdateConflict(Exception):
+    """O roster mudou concorrentemente em todas as tentativas de atualização."""
+
+
+def get_roster_storage_mode():
+    mode = current_app.config.get('ROSTER_STORAGE', ROSTER_STORAGE_ROWS)
+    if mode not in ROSTER_STORAGE_MODES:
+        raise ValueError(
+            f"ROSTER_STORAGE inválido: '{mode}'. Use um de {', '.join(ROSTER_STORAGE_MODES)}.")
+    return mode
+
+
+def pack_character_ids(character_ids):
+    return json.dumps(sorted(set(character_ids)), separators=(',', ':'))
+
+
+def unpack_character_ids(packed_character_ids):
+    return json.loads(packed_character_ids) if packed_character_ids else []
+
+
+def get_owned_character_ids(user):
+    """
+    IDs possuídos pelo usuário: no modo 'packed', em ordem de ID e sem consulta
+    extra; no modo 'rows', na ordem da tabela, com uma consulta de uma coluna.
+    """
+    if get_roster_storage_mode() == ROSTER_STORAGE_PACKED:
+        return unpack_character_ids(user.owned_characters_packed)
+    return list(db.session.execute(
+        db.select(OwnedCharacter.character_id).where(OwnedCharacter.user_id == user.id)).scalars())
+
+
+def apply_owned_characters_diff(user, added_ids, removed_ids):
+    """
+    Aplica a diferença do roster em uma única transação, sem perder escritas
+    concorrentes do mesmo usuário. No modo 'rows', um INSERT em lote para os
+    adicionados e um DELETE para os removidos; um adicionado que outra requisição
+    já inseriu é ignorado. No modo 'packed', a coluna é relida e gravada com um
+    UPDATE condicionado ao valor lido, refeito se ela mudou nesse intervalo.
+    Nada é executado se ambos estiverem vazios. Levanta RosterUpdateConflict se
+    todas as ROSTER_UPDATE_MAX_ATTEMPTS tentativas colidirem.
+    """
+    if not added_ids and not removed_ids:
+        return
+    if get_roster_storage_mode() == ROSTER_STORAGE_PACKED:
+        _apply_packed_diff(user.id, added_ids, removed_ids)
+    else:
+        _apply_rows_diff(user.id, added_ids, removed_ids)
+
+
+def _apply_packed_diff(user_id, added_ids, removed_ids):
+    for _ in range(ROSTER_UPDATE_MAX_ATTEMPTS):
+        packed_character_ids = db.session.execute(
+            db.select(User.owned_characters_packed).where(User.id == user_id)).scalar()
+        owned_ids = set(unpack_character_ids(packed_character_ids))
+        result = db.session.execute(
+            db.update(User)
+            .where(User.id == user_id,
+                   User.owned_characters_packed.is_not_distinct_from(packed_character_ids))
+            .values(owned_characters_packed=pack_character_ids(
+                owned_ids.difference(removed_ids).union(added_ids)))
+            .execution_options(synchronize_session=False))
+        if result.rowcount == 1:
+            db.session.commit()
+            return
+        db.session.rollback()
+    raise RosterUpdateConflict(
+        f"Roster do usuário {user_id} alterado concorrentemente em {ROSTER_UPDATE_MAX_ATTEMPTS} tentativas.")
+
+
+def _apply_rows_diff(user_id, added_ids, removed_ids):
+    for _ in range(ROSTER_UPDATE_MAX_ATTEMPTS):
+        try:
+            if added_ids:
+                db.session.execute(db.insert(OwnedCharacter), [
+                    {"user_id": user_id, "character_id": char_id} for char_id in added_ids])
+            if removed_ids:
+                db.session.execute(db.delete(OwnedCharacter).where(
+                    OwnedCharacter.user_id == user_id,
+                    OwnedCharacter.character_id.in_(removed_ids)))
+            db.session.commit()
+            return
+        except IntegrityError:
+            # Outra requisição inseriu parte dos mesmos IDs: só os que faltam são inseridos
+            db.session.rollback()
+            inserted_ids = set(db.session.execute(
+                db.select(OwnedCharacter.character_id).where(
+                    OwnedCharacter.user_id == user_id,
+                    OwnedCharacter.character_id.in_(added_ids))).scalars())
+            added_ids = [char_id for char_id in added_ids if char_id not in inserted_ids]
+    raise RosterUpdateConflict(
+        f"Roster do usuário {user_id} alterado concorrentemente em {ROSTER_UPDATE_MAX_ATTEMPTS} tentativas.")
+
+
+def ensure_packed_roster_column():
+    """
+    Adiciona User.owned_characters_packed a bancos criados antes da coluna
+    existir (db.create_all não altera tabelas existentes). Retorna True se a
+    coluna foi criada.
+    """
+    table_name = User.__tablename__
+    column_names = {column['name']
+                    for column in inspect(db.engine).get_columns(table_name)}
+    if 'owned_characters_packed' in column_names:
+        return False
+    quoted_table_name = db.engine.dialect.identifier_preparer.quote(table_name)
+    with db.engine.begin() as connection:
+        connection.execute(
+            text(f"ALTER TABLE {quoted_table_name} ADD COLUMN owned_characters_packed TEXT"))
+    return True
+
+
+def migrate_roster_storage(target_mode):
+    """
+    Copia os rosters de todos os usuários para o modo 'target_mode' em uma única
+    transação: 'packed' preenche a coluna a partir das linhas de OwnedCharacter;
+    'rows' recria as linhas a partir da coluna, só para os usuários com a coluna
+    preenchida (os demais não são tocados). O armazenamento de origem é mantido,
+    permitindo voltar ao modo anterior. Retorna o número de usuários migrados.
+    """
+    if target_mode not in ROSTER_STORAGE_MODES:
+        raise ValueError(
+            f"Modo de destino inválido: '{target_mode}'. Use um de {', '.join(ROSTER_STORAGE_MODES)}.")
+    ensure_packed_roster_column()
+
+    if target_mode == ROSTER_STORAGE_PACKED:
+        ids_by_user = {}
+        for user_id, char_id in db.session.execute(
+                db.select(OwnedCharacter.user_id, OwnedCharacter.character_id)):
+            ids_by_user.setdefault(user_id, []).append(char_id)
+        user_ids = list(db.session.execute(db.select(User.id)).scalars())
+        if user_ids:
+            db.session.execute(db.update(User), [
+                {"id": user_id, "owned_characters_packed": pack_character_ids(ids_by_user.get(user_id, []))}
+                for user_id in user_ids])
+    else:
+        # Usuários sem a coluna preenchida (nunca migrados para 'packed') mantêm as linhas atuais
+        packed_rosters = db.session.execute(
+            db.select(User.id, User.owned_characters_packed)
+            .where(User.owned_characters_packed.is_not(None))).all()
+        user_ids = [user_id for user_id, _ in packed_rosters]
+        if user_ids:
+            db.session.execute(db.delete(OwnedCharacter).where(
+                OwnedCharacter.user_id.in_(user_ids)))
+        owned_rows = [{"user_id": user_id, "character_id": char_id}
+                      for user_id, packed_character_ids in packed_rosters
+                      for char_id in unpack_character_ids(packed_character_ids)]
+        if owned_rows:
+            db.session.execute(db.insert(OwnedCharacter), owned_rows)
+    db.session.commit()
+    return len(user_ids)
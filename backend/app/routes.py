@@ -1,21 +1,26 @@
 # backend/app/routes.py
-from flask import Blueprint, jsonify, request, abort
+from flask import Blueprint, current_app, jsonify, request, abort
 from flask_login import login_user, logout_user, login_required, current_user
 from functools import wraps
+import time
 
 from . import db
 from . import csrf_protect
 from flask_wtf.csrf import generate_csrf
 
-from .models import User, OwnedCharacter, TierListEntry  # Importar TierListEntry
+from .models import User
 
 from .data_loader import (
-    get_all_characters_list,
+    CHARACTER_SLIM_FIELDS,
     get_all_characters_map,
-    get_all_artifacts_list,
-    get_all_weapons_list,
-    get_teams_for_character_from_file
+    get_catalog_payload,
+    get_character_fields,
+    get_characters_page,
+    get_game_data,
+    reload_changed_game_data
 )
+from .roster_storage import RosterUpdateConflict, apply_owned_characters_diff, get_owned_character_ids
+from .tierlist_cache import TIER_LIST_GENERATION_TTL, get_tier_list_cache
 from .services import team_suggester
 
 bp = Blueprint('api', __name__, url_prefix='/api')
@@ -93,6 +98,31 @@ def admin_only_route():
     return jsonify({"message": f"Olá, ADMIN {current_user.username}! Você tem acesso a conteúdo exclusivo de administrador."})
 
 
+@bp.route('/admin/reload-game-data', methods=['POST'])
+@role_required('admin')
+def reload_game_data_route():
+    """
+    Recarrega imediatamente os arquivos de dados alterados, sem esperar o watcher.
+    Sob o Gunicorn, afeta apenas o worker que atendeu a requisição; os demais
+    recarregam pelo próprio watcher.
+    """
+    try:
+        summary = reload_changed_game_data()
+    except Exception as e:
+        print(f"ERRO em /api/admin/reload-game-data: {str(e)}")
+        return jsonify({"error": "Erro ao recarregar os dados do jogo."}), 500
+    if summary is None:
+        return jsonify({"message": "Nenhum arquivo de dados foi alterado.", "reloaded": []}), 200
+    return jsonify({"message": "Dados do jogo recarregados.", **summary}), 200
+
+
+@bp.route('/admin/suggestion-cache', methods=['GET'])
+@role_required('admin')
+def suggestion_cache_stats_route():
+    """Métricas do cache de sugestões (do worker que atendeu a requisição)."""
+    return jsonify(team_suggester.get_suggestion_cache_stats()), 200
+
+
 @bp.route('/logout', methods=['POST'])
 @login_required
 def logout():
@@ -111,41 +141,91 @@ def get_csrf_token():
 @bp.route('/user/characters', methods=['GET'])
 @login_required
 def get_owned_characters():
-    owned_char_ids = [
-        oc.character_id for oc in current_user.owned_characters_association]
-    return jsonify(owned_char_ids)
+    return jsonify(get_owned_character_ids(current_user))
 
 
-@bp.route('/user/characters', methods=['POST'])
-@login_required
-def update_owned_characters():
-    data = request.get_json()
-    owned_character_ids_from_request = data.get('character_ids', [])
-
-    if not isinstance(owned_character_ids_from_request, list):
+def _invalid_character_ids_response(character_ids):
+    """Valida uma lista de IDs vinda da requisição; retorna a resposta de erro ou None."""
+    if not isinstance(character_ids, list):
         return jsonify({"error": "A entrada deve ser uma lista de IDs de personagens."}), 400
 
-    all_valid_character_ids = set(get_all_characters_map().keys())
-    for char_id in owned_character_ids_from_request:
+    all_valid_character_ids = get_all_characters_map()
+    for char_id in character_ids:
         if not isinstance(char_id, str) or char_id.strip() == '':
             return jsonify({"error": f"ID de personagem inválido encontrado: '{char_id}'."}), 400
         if char_id not in all_valid_character_ids:
             return jsonify({"error": f"O personagem com ID '{char_id}' não é um ID de personagem válido no jogo."}), 400
+    return None
 
-    for oc in current_user.owned_characters_association:
-        db.session.delete(oc)
-    db.session.commit()
 
-    new_owned_characters = []
-    for char_id in owned_character_ids_from_request:
-        new_owned_char = OwnedCharacter(
-            user_id=current_user.id, character_id=char_id)  # type: ignore
-        db.session.add(new_owned_char)
-        new_owned_characters.append(char_id)
+@bp.route('/user/characters', methods=['POST'])
+@login_required
+def update_owned_characters():
+    data = request.get_json()
+    owned_character_ids_from_request = data.get('character_ids', [])
 
-    db.session.commit()
+    error_response = _invalid_character_ids_response(
+        owned_character_ids_from_request)
+    if error_response:
+        return error_response
+
+    # Remove duplicatas mantendo a ordem enviada
+    new_owned_characters = list(dict.fromkeys(owned_character_ids_from_request))
+    current_owned_ids = set(get_owned_character_ids(current_user))
+    added_ids = [char_id for char_id in new_owned_characters
+                 if char_id not in current_owned_ids]
+    removed_ids = sorted(current_owned_ids.difference(new_owned_characters))
+    try:
+        apply_owned_characters_diff(current_user, added_ids, removed_ids)
+    except RosterUpdateConflict as e:
+        print(f"AVISO em /api/user/characters: {str(e)}")
+        return jsonify({"error": "O roster foi alterado por outra requisição. Tente novamente."}), 409
+    except Exception as e:
+        db.session.rollback()
+        print(f"ERRO em /api/user/characters: {str(e)}")
+        return jsonify({"error": "Erro ao salvar os personagens possuídos."}), 500
 
-    return jsonify({"message": "Personagens possuídos atualizados com sucesso.", "owned_characters": new_owned_characters}), 200
+    return jsonify({"message": "Personagens possuídos atualizados com sucesso.", "owned_characters": new_owned_characters,
+                    "added": added_ids, "removed": removed_ids}), 200
+
+
+@bp.route('/user/characters', methods=['PATCH'])
+@login_required
+def patch_owned_characters():
+    """
+    Adiciona e/ou remove personagens do roster sem reenviar a lista completa.
+    Corpo: {"add": [ids], "remove": [ids]}; ambos opcionais. IDs já possuídos em
+    'add' e não possuídos em 'remove' são ignorados.
+    """
+    data = request.get_json(silent=True) or {}
+    ids_to_add = data.get('add', [])
+    ids_to_remove = data.get('remove', [])
+    for character_ids in (ids_to_add, ids_to_remove):
+        error_response = _invalid_character_ids_response(character_ids)
+        if error_response:
+            return error_response
+    conflicting_ids = set(ids_to_add) & set(ids_to_remove)
+    if conflicting_ids:
+        return jsonify({"error": f"IDs presentes em 'add' e 'remove' ao mesmo tempo: {', '.join(sorted(conflicting_ids))}."}), 400
+
+    current_owned_ids = set(get_owned_character_ids(current_user))
+    added_ids = [char_id for char_id in dict.fromkeys(ids_to_add)
+                 if char_id not in current_owned_ids]
+    removed_ids = sorted(current_owned_ids.intersection(ids_to_remove))
+    try:
+        apply_owned_characters_diff(current_user, added_ids, removed_ids)
+    except RosterUpdateConflict as e:
+        print(f"AVISO em PATCH /api/user/characters: {str(e)}")
+        return jsonify({"error": "O roster foi alterado por outra requisição. Tente novamente."}), 409
+    except Exception as e:
+        db.session.rollback()
+        print(f"ERRO em PATCH /api/user/characters: {str(e)}")
+        return jsonify({"error": "Erro ao salvar os personagens possuídos."}), 500
+
+    owned_characters = sorted(
+        current_owned_ids.difference(removed_ids).union(added_ids))
+    return jsonify({"message": "Personagens possuídos atualizados com sucesso.", "owned_characters": owned_characters,
+                    "added": added_ids, "removed": removed_ids}), 200
 
 # --- ROTAS DE DADOS ---
 
@@ -155,31 +235,94 @@ def health_check():
     return jsonify({"status": "ok", "message": "Backend está funcionando!"}), 200
 
 
+def _catalog_response(catalog_name, error_message):
+    payload = get_catalog_payload(catalog_name)
+    if payload is None:
+        print(
+            f"ERRO em /api/{catalog_name}: Catálogo não pré-serializado no carregamento.")
+        return jsonify({"error": error_message}), 500
+    return _payload_response(payload)
+
+
+def _payload_response(payload):
+    """
+    Responde com um corpo pré-serializado (CatalogPayload), escolhendo a variante
+    comprimida aceita pelo cliente e respondendo 304 quando o If-None-Match
+    corresponde ao ETag da variante.
+    """
+    accepted_encodings = request.accept_encodings
+    if payload.brotli_body is not None and accepted_encodings['br']:
+        content_encoding, body = 'br', payload.brotli_body
+    elif accepted_encodings['gzip']:
+        content_encoding, body = 'gzip', payload.gzip_body
+    else:
+        content_encoding, body = None, payload.body
+    # ETag forte por representação: cada codificação tem bytes diferentes
+    etag = f"{payload.etag}-{content_encoding}" if content_encoding else payload.etag
+
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(
+            body, mimetype='application/json')
+        if content_encoding:
+            response.headers['Content-Encoding'] = content_encoding
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+# Paginação de /api/characters (usada quando 'cursor' ou 'limit' é informado)
+DEFAULT_CHARACTERS_PAGE_SIZE = 50
+MAX_CHARACTERS_PAGE_SIZE = 200
+
+
 @bp.route('/characters', methods=['GET'])
 def get_characters_route():
-    all_characters = get_all_characters_list()
-    if not isinstance(all_characters, list):
-        print("ERRO em /api/characters: Dados de personagens não carregados ou formato inválido.")
-        return jsonify({"error": "Dados de personagens não disponíveis no momento."}), 500
-    return jsonify(all_characters)
+    """
+    Sem parâmetros, devolve o catálogo completo. 'fields=id,name,...' projeta os
+    campos de cada personagem; 'cursor'/'limit' paginam em ordem de ID e mudam a
+    resposta para {"items": [...], "next_cursor": ...}.
+    """
+    error_message = "Dados de personagens não disponíveis no momento."
+    fields = None
+    fields_param = request.args.get('fields')
+    if fields_param:
+        fields = tuple(dict.fromkeys(
+            field.strip() for field in fields_param.split(',') if field.strip()))
+        unknown_fields = set(fields) - get_character_fields()
+        if unknown_fields:
+            return jsonify({"error": f"Campos desconhecidos em 'fields': {', '.join(sorted(unknown_fields))}."}), 400
+
+    cursor = request.args.get('cursor')
+    limit_param = request.args.get('limit')
+    if cursor is None and limit_param is None:
+        if fields is None:
+            return _catalog_response('characters', error_message)
+        if set(fields) == set(CHARACTER_SLIM_FIELDS):
+            return _catalog_response('characters_slim', error_message)
+        projected_characters, _ = get_characters_page(fields)
+        return jsonify(projected_characters)
+
+    try:
+        limit = int(
+            limit_param) if limit_param is not None else DEFAULT_CHARACTERS_PAGE_SIZE
+    except ValueError:
+        return jsonify({"error": "'limit' deve ser um número inteiro."}), 400
+    limit = max(1, min(limit, MAX_CHARACTERS_PAGE_SIZE))
+
+    page_characters, next_cursor = get_characters_page(fields, cursor, limit)
+    return jsonify({"items": page_characters, "next_cursor": next_cursor})
 
 
 @bp.route('/artifacts-database', methods=['GET'])
 def get_artifacts_database_route():
-    all_artifacts = get_all_artifacts_list()
-    if not isinstance(all_artifacts, list):
-        print("ERRO em /api/artifacts-database: Dados de artefatos não carregados ou formato inválido.")
-        return jsonify({"error": "Banco de dados de artefatos não disponível no momento."}), 500
-    return jsonify(all_artifacts)
+    return _catalog_response('artifacts', "Banco de dados de artefatos não disponível no momento.")
 
 
 @bp.route('/weapons-database', methods=['GET'])
 def get_weapons_database_route():
-    all_weapons = get_all_weapons_list()
-    if not isinstance(all_weapons, list):
-        print("ERRO em /api/weapons-database: Dados de armas não carregados ou formato inválido.")
-        return jsonify({"error": "Banco de dados de armas não disponível no momento."}), 500
-    return jsonify(all_weapons)
+    return _catalog_response('weapons', "Banco de dados de armas não disponível no momento.")
 
 
 @bp.route('/character/<string:character_id>', methods=['GET'])
@@ -194,113 +337,176 @@ def get_specific_character_route(character_id):
 
 @bp.route('/teams-for-character/<string:character_id>', methods=['GET'])
 def get_character_teams_route(character_id):
-    team_templates_for_char = get_teams_for_character_from_file(character_id)
     all_chars_map_for_population = get_all_characters_map()
-    populated_teams_list = []
 
     if not all_chars_map_for_population:
         print(
             f"ERRO: Falha ao carregar all_chars_map_for_population para popular times de {character_id}")
         return jsonify({"error": "Dados de personagens base não puderam ser carregados no servidor."}), 500
 
-    for team_template in team_templates_for_char:
-        populated_team = dict(team_template)
-        populated_team["characters_in_team"] = []
-        template_character_slots = team_template.get("characters_in_team", [])
+    populated_teams_list = team_suggester.get_teams_for_character(character_id)
+    return jsonify(populated_teams_list)
 
-        if len(template_character_slots) != 4:
-            print(
-                f"AVISO: Template de time '{team_template.get('name')}' para '{character_id}' não tem 4 personagens, pulando.")
-            continue
-
-        all_slots_valid = True
-        for slot_info in template_character_slots:
-            char_id_in_slot = slot_info.get("character_id")
-            char_build_key = slot_info.get("build_key")
-            base_char_data_from_map = all_chars_map_for_population.get(
-                char_id_in_slot)
-
-            if base_char_data_from_map:
-                specific_build_details = None
-                build_options = base_char_data_from_map.get(
-                    "build_options", [])
-                if char_build_key and build_options:
-                    specific_build_details = next(
-                        (b for b in build_options if b.get("key") == char_build_key), None)
-
-                if not specific_build_details and build_options:
-                    specific_build_details = build_options[0]
-                    print(
-                        f"AVISO: Build com key '{char_build_key}' não encontrada para '{char_id_in_slot}'. Usando a primeira build disponível.")
-                elif not build_options:
-                    print(
-                        f"AVISO: Nenhuma build_options encontrada para '{char_id_in_slot}'.")
-
-                char_slot_for_display = {
-                    "id": base_char_data_from_map.get("id"),
-                    "name": base_char_data_from_map.get("name"),
-                    "icon_url": base_char_data_from_map.get("icon_url"),
-                    "element": base_char_data_from_map.get("element"),
-                    "rarity": base_char_data_from_map.get("rarity"),
-                    "role_in_team": slot_info.get("role_in_team"),
-                    "build_key": char_build_key,
-                    "build_details": specific_build_details if specific_build_details else {}
-                }
-                populated_team["characters_in_team"].append(
-                    char_slot_for_display)
-            else:
-                print(
-                    f"AVISO: Personagem com ID '{char_id_in_slot}' do template de time '{team_template.get('name')}' não encontrado.")
-                all_slots_valid = False
-                break
-
-        if all_slots_valid:
-            populated_teams_list.append(populated_team)
 
-    return jsonify(populated_teams_list)
+def _suggestion_seed(data):
+    """Semente opcional do time de fallback; retorna (seed, resposta de erro)."""
+    seed = data.get('seed') if isinstance(data, dict) else None
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, (int, str))):
+        return None, (jsonify({"error": "'seed' deve ser um número inteiro ou texto."}), 400)
+    return seed, None
+
+
+def _suggestion_page(data):
+    """
+    'limit'/'offset' da página de sugestões (no corpo JSON ou na query string);
+    retorna (limit, offset, resposta de erro).
+    """
+    data = data if isinstance(data, dict) else {}
+    try:
+        limit = int(data.get('limit', request.args.get(
+            'limit', team_suggester.DEFAULT_SUGGESTION_LIMIT)))
+        offset = int(data.get('offset', request.args.get('offset', 0)))
+    except (TypeError, ValueError):
+        return None, None, (jsonify({"error": "'limit' e 'offset' devem ser números inteiros."}), 400)
+    limit = max(1, min(limit, team_suggester.MAX_SUGGESTION_LIMIT))
+    return limit, max(0, offset), None
+
+
+# time.monotonic() da última leitura da tier list para o ranking que falhou, ou
+# None se ela foi lida. Depois de uma falha, a leitura só é tentada de novo após
+# TIER_LIST_GENERATION_TTL segundos; o aviso sai uma vez por falha seguida.
+_TIER_LIST_FAILED_AT = None
+
+
+def _tier_list_scores():
+    """
+    (geração, average_numeric_tier por personagem) da tier list, usados no ranking
+    das sugestões; (None, {}) se ela não puder ser lida.
+    """
+    global _TIER_LIST_FAILED_AT
+    failed_at = _TIER_LIST_FAILED_AT
+    if failed_at is not None and time.monotonic() - failed_at < TIER_LIST_GENERATION_TTL:
+        return None, {}
+    try:
+        tier_list_cache = get_tier_list_cache()
+    except Exception as e:
+        db.session.rollback()
+        if failed_at is None:
+            error_summary = (str(e).splitlines() or [type(e).__name__])[0]
+            print(
+                f"AVISO: Tier list indisponível para o ranking de sugestões: {error_summary}")
+        _TIER_LIST_FAILED_AT = time.monotonic()
+        return None, {}
+    _TIER_LIST_FAILED_AT = None
+    return tier_list_cache.generation, tier_list_cache.scores_by_character
 
 
 @bp.route('/suggest-team', methods=['POST'])
 def suggest_team_route():
-    data = request.get_json()
-    if not data or 'owned_characters' not in data:
+    """
+    Sugestões para um roster, ordenadas por pontuação (tier, cobertura de funções
+    e builds). 'limit' (padrão 50, máximo 200) e 'offset' paginam o resultado; o
+    total de times fica no cabeçalho X-Total-Count.
+    """
+    data = request.get_json(silent=True)
+    seed, error_response = _suggestion_seed(data)
+    if error_response:
+        return error_response
+    limit, offset, error_response = _suggestion_page(data)
+    if error_response:
+        return error_response
+    if data and 'owned_characters' in data:
+        owned_character_ids_set = set(data['owned_characters'])
+    elif current_user.is_authenticated:
+        # Sem 'owned_characters': usa o roster salvo do usuário autenticado
+        owned_character_ids_set = set(get_owned_character_ids(current_user))
+    else:
         return jsonify({"error": "Dados inválidos. 'owned_characters' é esperado."}), 400
-
-    owned_character_ids_set = set(data['owned_characters'])
-    all_characters_info_list_for_suggester = get_all_characters_list()
+    # Personagens, times e ranking da requisição vêm todos do mesmo GameData
+    game_data = get_game_data()
+    all_characters_info_list_for_suggester = game_data.characters_list
 
     if not isinstance(all_characters_info_list_for_suggester, list) or not all_characters_info_list_for_suggester:
         print("ERRO em /api/suggest-team: Dados de personagens não carregados ou formato inválido para o sugestor.")
         return jsonify({"error": "Não foi possível carregar os dados dos personagens no servidor para sugestão."}), 500
 
     suggested_teams = team_suggester.generate_teams_from_owned(
-        owned_character_ids_set, all_characters_info_list_for_suggester
+        owned_character_ids_set, all_characters_info_list_for_suggester, seed, game_data
     )
-    return jsonify(suggested_teams)
+    tier_generation, tier_scores = _tier_list_scores()
+    response = jsonify(team_suggester.rank_suggested_teams(
+        suggested_teams, tier_scores, limit, offset, tier_generation, game_data))
+    response.headers['X-Total-Count'] = str(len(suggested_teams))
+    return response
+
+
+# Limite de rosters aceitos por chamada de /api/suggest-team/batch
+MAX_BATCH_ROSTERS = 500
+
+
+@bp.route('/suggest-team/batch', methods=['POST'])
+def suggest_team_batch_route():
+    """
+    Sugestões para vários rosters em uma única requisição. 'rosters' pode ser uma
+    lista de listas de IDs (resposta na mesma ordem) ou um objeto nome -> lista de
+    IDs (resposta com as mesmas chaves). 'seed', 'limit' e 'offset' opcionais
+    valem para todos os rosters.
+    """
+    data = request.get_json(silent=True)
+    seed, error_response = _suggestion_seed(data)
+    if error_response:
+        return error_response
+    limit, offset, error_response = _suggestion_page(data)
+    if error_response:
+        return error_response
+    rosters = data.get('rosters') if isinstance(data, dict) else None
+    if isinstance(rosters, dict):
+        roster_names = list(rosters.keys())
+        roster_lists = list(rosters.values())
+    elif isinstance(rosters, list):
+        roster_names = None
+        roster_lists = rosters
+    else:
+        return jsonify({"error": "Dados inválidos. 'rosters' (lista ou objeto de listas de IDs) é esperado."}), 400
+
+    if len(roster_lists) > MAX_BATCH_ROSTERS:
+        return jsonify({"error": f"Máximo de {MAX_BATCH_ROSTERS} rosters por requisição."}), 400
+    if not all(isinstance(roster, list) for roster in roster_lists):
+        return jsonify({"error": "Cada roster deve ser uma lista de IDs de personagens."}), 400
+
+    game_data = get_game_data()
+    all_characters_info_list_for_suggester = game_data.characters_list
+    if not isinstance(all_characters_info_list_for_suggester, list) or not all_characters_info_list_for_suggester:
+        print("ERRO em /api/suggest-team/batch: Dados de personagens não carregados ou formato inválido para o sugestor.")
+        return jsonify({"error": "Não foi possível carregar os dados dos personagens no servidor para sugestão."}), 500
+
+    owned_character_id_sets = [
+        {char_id for char_id in roster if isinstance(char_id, str)} for roster in roster_lists]
+    suggestions_per_roster = team_suggester.generate_teams_for_rosters(
+        owned_character_id_sets, all_characters_info_list_for_suggester, seed, game_data)
+    tier_generation, tier_scores = _tier_list_scores()
+    suggestions_per_roster = [team_suggester.rank_suggested_teams(suggestions, tier_scores, limit, offset,
+                                                                  tier_generation, game_data)
+                              for suggestions in suggestions_per_roster]
+
+    if roster_names is not None:
+        return jsonify(dict(zip(roster_names, suggestions_per_roster)))
+    return jsonify(suggestions_per_roster)
 
 # --- ROTA PARA OBTER A TIER LIST CONSOLIDADA ---
-# Importe o modelo TierListEntry no topo do routes.py: from .models import User, OwnedCharacter, TierListEntry
 
 
 @bp.route('/tierlist', methods=['GET'])
 def get_tier_list_route():
+    """
+    Tier list consolidada, servida do cache em memória (tierlist_cache) com ETag
+    e variantes comprimidas; o cache é remontado quando o orquestrador grava
+    uma nova geração.
+    """
     try:
-        tier_list_entries = TierListEntry.query.all()
-        tier_list_data = []
-        for entry in tier_list_entries:
-            tier_list_data.append({
-                "character_id": entry.character_id,
-                "character_name": entry.character_name,
-                "tier_level": entry.tier_level,
-                "role": entry.role,
-                "constellation": entry.constellation,
-                "rarity": entry.rarity,
-                "element": entry.element,
-                "average_numeric_tier": entry.average_numeric_tier,  # <-- ADICIONADO
-                "sources_contributing": entry.sources_contributing,  # <-- ADICIONADO
-                "original_scores_by_site": entry.original_scores_by_site  # <-- ADICIONADO
-            })
-        return jsonify(tier_list_data), 200
+        tier_list_cache = get_tier_list_cache()
     except Exception as e:
+        db.session.rollback()
         print(f"ERRO ao buscar tierlist do DB: {e}")
         return jsonify({"error": "Não foi possível carregar a Tier List no momento."}), 500
+    return _payload_response(tier_list_cache.payload)
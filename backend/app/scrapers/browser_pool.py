@@ -0,0 +1,186 @@
+# backend/app/scrapers/browser_pool.py
+# Pool de navegadores Chrome headless compartilhado pelos scrapers que usam
+# Selenium. Iniciar o Chrome domina o tempo desses scrapers, então os navegadores
+# são criados uma vez (podendo ser aquecidos em segundo plano), emprestados a cada
+# raspagem e devolvidos limpos para reuso nas próximas execuções do processo.
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Tempo limite (s) padrão da busca de uma página de tier list (navegador ou requests)
+SCRAPER_PAGE_TIMEOUT = 30
+# Máximo de navegadores abertos ao mesmo tempo
+BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '2'))
+# Bloqueia o download de imagens e fontes (as tier lists só precisam do HTML)
+BROWSER_BLOCK_RESOURCES = os.getenv(
+    'BROWSER_BLOCK_RESOURCES', '1').lower() not in ('0', 'false', 'no')
+BLOCKED_RESOURCE_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+]
+
+
+def create_browser():
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    # Não espera imagens/estilos terminarem: os scrapers esperam o elemento que precisam
+    options.page_load_strategy = 'eager'
+    if BROWSER_BLOCK_RESOURCES:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2})
+
+    driver = webdriver.Chrome(options=options)
+    if BROWSER_BLOCK_RESOURCES:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {
+                               "urls": BLOCKED_RESOURCE_URL_PATTERNS})
+    return driver
+
+
+def _quit_browser(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        print(f"AVISO: Erro ao fechar navegador do pool: {e}")
+
+
+class BrowserPool:
+    """
+    Até 'size' navegadores, criados sob demanda (ou por warm_up) e reutilizados.
+    acquire() espera um navegador livre quando todos estão em uso ou sendo
+    criados; release() limpa o navegador e o devolve, ou o descarta se ele não
+    responder mais.
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, browser_factory=create_browser):
+        self.size = max(1, size)
+        self._browser_factory = browser_factory
+        self._idle_browsers = []
+        # Navegadores existentes ou em criação (livres + emprestados)
+        self._browser_count = 0
+        self._condition = threading.Condition()
+
+    def _create_counted_browser(self):
+        try:
+            return self._browser_factory()
+        except Exception:
+            with self._condition:
+                self._browser_count -= 1
+                self._condition.notify()
+            raise
+
+    def acquire(self, timeout=None):
+        with self._condition:
+            if not self._condition.wait_for(
+                    lambda: self._idle_browsers or self._browser_count < self.size, timeout):
+                raise TimeoutError(
+                    "Nenhum navegador do pool ficou livre a tempo.")
+            if self._idle_browsers:
+                return self._idle_browsers.pop()
+            self._browser_count += 1
+        return self._create_counted_browser()
+
+    def release(self, driver, discard=False):
+        if not discard:
+            try:
+                driver.delete_all_cookies()
+                driver.get("about:blank")
+            except Exception as e:
+                print(f"AVISO: Navegador do pool não respondeu e será descartado: {e}")
+                discard = True
+        if discard:
+            _quit_browser(driver)
+        with self._condition:
+            if discard:
+                self._browser_count -= 1
+            else:
+                self._idle_browsers.append(driver)
+            self._condition.notify()
+
+    @contextmanager
+    def browser(self, timeout=None):
+        """
+        Empresta um navegador durante o bloco 'with'. Se o bloco levantar uma
+        exceção (inclusive um tempo limite, com a página possivelmente ainda
+        carregando), o navegador é descartado em vez de voltar ao pool.
+        """
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except Exception:
+            self.release(driver, discard=True)
+            raise
+        self.release(driver)
+
+    def _warm_up_browser(self):
+        try:
+            driver = self._create_counted_browser()
+        except Exception as e:
+            print(f"AVISO: Falha ao aquecer navegador do pool: {e}")
+            return
+        with self._condition:
+            self._idle_browsers.append(driver)
+            self._condition.notify()
+
+    def warm_up(self, count=None):
+        """
+        Inicia em segundo plano navegadores até o pool ter 'count' (padrão: size);
+        quem chamar acquire() enquanto isso recebe o primeiro que ficar pronto.
+        """
+        target_count = self.size if count is None else min(count, self.size)
+        with self._condition:
+            missing_count = max(0, target_count - self._browser_count)
+            self._browser_count += missing_count
+        for _ in range(missing_count):
+            threading.Thread(target=self._warm_up_browser,
+                             name="browser-pool-warm-up", daemon=True).start()
+
+    def close(self):
+        with self._condition:
+            idle_browsers, self._idle_browsers = self._idle_browsers, []
+            self._browser_count -= len(idle_browsers)
+        for driver in idle_browsers:
+            _quit_browser(driver)
+
+
+BROWSER_POOL = None
+_BROWSER_POOL_LOCK = threading.Lock()
+
+
+def get_browser_pool():
+    global BROWSER_POOL
+    with _BROWSER_POOL_LOCK:
+        if BROWSER_POOL is None:
+            BROWSER_POOL = BrowserPool()
+            atexit.register(BROWSER_POOL.close)
+        return BROWSER_POOL
+
+
+def fetch_page_source(url, site_name, ready_locator, timeout=SCRAPER_PAGE_TIMEOUT):
+    """
+    Carrega 'url' em um navegador do pool, espera o elemento 'ready_locator'
+    ((By.*, seletor)) aparecer e devolve o page_source. A espera por um navegador
+    livre, o carregamento e a espera pelo elemento somam no máximo 'timeout'
+    segundos.
+    """
+    deadline = time.monotonic() + timeout
+    with get_browser_pool().browser(timeout) as driver:
+        print(f"Scraping {url} (Site: {site_name})...")
+        driver.set_page_load_timeout(max(1.0, deadline - time.monotonic()))
+        driver.get(url)
+
+        WebDriverWait(driver, max(1.0, deadline - time.monotonic())).until(
+            EC.presence_of_element_located(ready_locator))
+        print("Página carregada, extraindo HTML...")
+        return driver.page_source
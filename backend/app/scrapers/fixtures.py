@@ -0,0 +1,60 @@
+# backend/app/scrapers/fixtures.py
+# Gravação e reprodução do HTML buscado pelos scrapers (SCRAPER_FIXTURE_MODE):
+#   - 'off' (padrão): busca a página ao vivo;
+#   - 'record': busca ao vivo e salva o HTML (inclusive o page_source do Selenium)
+#     em SCRAPER_FIXTURES_DIR/<site>.html;
+#   - 'replay': lê o HTML salvo, sem rede nem navegador.
+# Nos três modos o HTML passa pela mesma função parse_<site> do scraper.
+import os
+
+SCRAPER_FIXTURE_MODE_OFF = 'off'
+SCRAPER_FIXTURE_MODE_RECORD = 'record'
+SCRAPER_FIXTURE_MODE_REPLAY = 'replay'
+SCRAPER_FIXTURE_MODES = (SCRAPER_FIXTURE_MODE_OFF,
+                         SCRAPER_FIXTURE_MODE_RECORD, SCRAPER_FIXTURE_MODE_REPLAY)
+
+SCRAPER_FIXTURE_MODE = os.getenv(
+    'SCRAPER_FIXTURE_MODE', SCRAPER_FIXTURE_MODE_OFF).lower()
+SCRAPER_FIXTURES_DIR = os.getenv('SCRAPER_FIXTURES_DIR', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'fixtures'))
+
+
+def get_fixture_path(site_name):
+    return os.path.join(SCRAPER_FIXTURES_DIR, f"{site_name}.html")
+
+
+def read_fixture(site_name):
+    with open(get_fixture_path(site_name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def write_fixture(site_name, html):
+    os.makedirs(SCRAPER_FIXTURES_DIR, exist_ok=True)
+    with open(get_fixture_path(site_name), 'w', encoding='utf-8') as f:
+        f.write(html)
+
+
+def fetches_live_html():
+    """Se os scrapers buscam as páginas ao vivo (fora do modo replay)."""
+    return SCRAPER_FIXTURE_MODE != SCRAPER_FIXTURE_MODE_REPLAY
+
+
+def fetch_html(site_name, fetch_live_html):
+    """
+    HTML da página de 'site_name' conforme SCRAPER_FIXTURE_MODE; fetch_live_html()
+    faz a busca ao vivo (requests ou Selenium) e só é chamada fora do modo replay.
+    """
+    if SCRAPER_FIXTURE_MODE not in SCRAPER_FIXTURE_MODES:
+        raise ValueError(
+            f"SCRAPER_FIXTURE_MODE inválido: '{SCRAPER_FIXTURE_MODE}'. Use um de {', '.join(SCRAPER_FIXTURE_MODES)}.")
+    if SCRAPER_FIXTURE_MODE == SCRAPER_FIXTURE_MODE_REPLAY:
+        print(
+            f"Usando HTML gravado de {site_name}: {get_fixture_path(site_name)}")
+        return read_fixture(site_name)
+
+    html = fetch_live_html()
+    if SCRAPER_FIXTURE_MODE == SCRAPER_FIXTURE_MODE_RECORD:
+        write_fixture(site_name, html)
+        print(
+            f"HTML de {site_name} gravado em {get_fixture_path(site_name)}")
+    return html
@@ -1,65 +1,685 @@
 # backend/app/services/team_suggester.py
+import hashlib
+import heapq
 import json
 import os
 import random
-import secrets
+import threading
 import uuid
+from array import array
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from itertools import combinations
+from math import comb
+from typing import Any, Dict, FrozenSet, Optional
 
-# --- Variável Global e Função de Carregamento de COMPOSIÇÕES DE TIMES ---
-DEFINED_COMPOSITIONS = []
+from ..data_loader import (
+    build_roster_mask,
+    get_character_build,
+    get_game_data,
+    get_game_data_version,
+    get_team_file_path,
+    get_teams_for_character_from_file,
+    list_json_files,
+    read_json_files
+)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele, o casamento em lote usa inteiros Python
+    np = None
+
+# --- Carregamento das COMPOSIÇÕES DE TIMES ---
 COMPOSITIONS_DATA_PATH = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), 'team_data')
 
 
-def load_defined_compositions():
-    global DEFINED_COMPOSITIONS
+def _build_compositions_index(compositions):
+    """
+    Monta o índice invertido character_id -> [índices de templates]. Templates sem
+    exatamente 4 slots com 'character_id' ficam fora do índice, pois nunca podem
+    ser formados.
+    """
+    by_character = {}
+    for idx, comp_template in enumerate(compositions):
+        slots = comp_template.get("characters_in_team", [])
+        if len(slots) != 4:
+            continue
+        member_ids = [slot.get("character_id") for slot in slots]
+        if not all(member_ids):
+            continue
+        for char_id in set(member_ids):
+            by_character.setdefault(char_id, []).append(idx)
+    return by_character
+
+
+def build_team_match_index(json_files, game_data):
+    """
+    Lê as composições de team_data/ e as compila contra os personagens de
+    game_data (um GameData ainda não publicado, durante uma carga). Retorna o
+    TeamMatchIndex, sem publicá-lo.
+    """
     new_compositions = []
+    new_composition_files = {}
     if not os.path.exists(COMPOSITIONS_DATA_PATH):
         print(
             f"AVISO CRÍTICO: Diretório de dados de composições de times não encontrado: {COMPOSITIONS_DATA_PATH}")
-        DEFINED_COMPOSITIONS = new_compositions
-        return
+        return compile_team_match_index(new_compositions, new_composition_files, game_data)
 
     print(
         f"INFO: Carregando composições de times de: {COMPOSITIONS_DATA_PATH}")
-    found_files = False
-    for filename in os.listdir(COMPOSITIONS_DATA_PATH):
-        if filename.endswith(".json"):
-            found_files = True
-            filepath = os.path.join(COMPOSITIONS_DATA_PATH, filename)
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        new_compositions.extend(data)
-                    else:
-                        print(
-                            f"AVISO: Arquivo JSON {filename} em team_data/ não contém uma lista de composições.")
-            except json.JSONDecodeError:
-                print(
-                    f"ERRO: Não foi possível decodificar JSON de {filename} em team_data/.")
-            except Exception as e:
-                print(
-                    f"ERRO: Não foi possível carregar composições de {filename} em team_data/: {str(e)}")
+    if json_files is None:
+        json_files = read_json_files(list_json_files(COMPOSITIONS_DATA_PATH))
+    found_files = bool(json_files)
+    for json_file in json_files:
+        filename = os.path.basename(json_file.path)
+        if isinstance(json_file.error, json.JSONDecodeError):
+            print(
+                f"ERRO: Não foi possível decodificar JSON de {filename} em team_data/.")
+        elif json_file.error is not None:
+            print(
+                f"ERRO: Não foi possível carregar composições de {filename} em team_data/: {str(json_file.error)}")
+        elif isinstance(json_file.data, list):
+            # mtime lido antes do conteúdo: uma edição concorrente invalida o cache
+            new_composition_files[filename[:-len(".json")]] = (
+                json_file.mtime_ns, list(range(len(new_compositions), len(new_compositions) + len(json_file.data))))
+            new_compositions.extend(json_file.data)
+        else:
+            print(
+                f"AVISO: Arquivo JSON {filename} em team_data/ não contém uma lista de composições.")
 
-    DEFINED_COMPOSITIONS = new_compositions
-    if DEFINED_COMPOSITIONS:
+    if new_compositions:
         print(
-            f"INFO: Total de {len(DEFINED_COMPOSITIONS)} templates de composições de times carregados.")
+            f"INFO: Total de {len(new_compositions)} templates de composições de times carregados.")
     elif found_files:
         print("AVISO: Nenhum template de composição de time válido foi carregado de team_data/, embora arquivos JSON tenham sido encontrados.")
     else:
         print(
             f"AVISO: Nenhum arquivo .json de composição de time encontrado em {COMPOSITIONS_DATA_PATH}.")
+    return compile_team_match_index(new_compositions, new_composition_files, game_data)
+
+
+# Chave que identifica cada item das listas de build ao aplicar build_overrides
+BUILD_OVERRIDE_LIST_KEYS = {
+    "weapons": "weapon_id",
+    "artifacts": "set_id",
+}
+
+
+def _deep_merge(base_value, override_value):
+    """
+    Retorna um novo valor com override_value aplicado sobre base_value sem alterar
+    nenhum dos dois. Dicionários são mesclados recursivamente; qualquer outro tipo
+    é substituído. Sub-objetos não tocados são compartilhados, não copiados.
+    """
+    if isinstance(base_value, dict) and isinstance(override_value, dict):
+        merged = dict(base_value)
+        for key, value in override_value.items():
+            merged[key] = _deep_merge(base_value.get(key), value)
+        return merged
+    return override_value
+
+
+def _merge_keyed_list(base_items, override_items, item_key):
+    """
+    Mescla listas de armas/artefatos pelo identificador item_key: itens com o mesmo
+    identificador são mesclados, os demais são adicionados ao final.
+    """
+    merged_items = list(base_items or [])
+    positions = {item.get(item_key): pos for pos, item in enumerate(merged_items)
+                 if isinstance(item, dict) and item.get(item_key)}
+    for override_item in override_items:
+        pos = positions.get(override_item.get(item_key)) if isinstance(
+            override_item, dict) else None
+        if pos is None:
+            merged_items.append(override_item)
+        else:
+            merged_items[pos] = _deep_merge(merged_items[pos], override_item)
+    return merged_items
+
+
+def merge_build_overrides(base_build, overrides):
+    """
+    Aplica os build_overrides de um slot de template sobre uma build e retorna uma
+    nova build (copy-on-write); base_build, que vem dos personagens do GameData, nunca é
+    alterada. Suporta:
+      - notes_override: texto acrescentado a notes_build;
+      - main_stats e demais campos dict: merge profundo;
+      - weapons/artifacts: merge por weapon_id/set_id (ou substituição completa se
+        o override não for uma lista).
+    """
+    merged_build = dict(base_build)
+    for key, value in overrides.items():
+        if key == "notes_override":
+            merged_build["notes_build"] = (base_build.get("notes_build") or "") + \
+                " (Time Específico: " + value + ")"
+        elif key in BUILD_OVERRIDE_LIST_KEYS and isinstance(value, list):
+            merged_build[key] = _merge_keyed_list(
+                base_build.get(key), value, BUILD_OVERRIDE_LIST_KEYS[key])
+        else:
+            merged_build[key] = _deep_merge(base_build.get(key), value)
+    return merged_build
+
+
+@dataclass(frozen=True)
+class CompiledTeam:
+    """
+    Time resolvido a partir de um template de team_data/: slots já populados com
+    os dados de exibição do personagem e a build resolvida (com build_overrides).
+    'payload' é o dicionário pronto para serialização e não deve ser modificado,
+    pois é compartilhado entre todas as requisições.
+    """
+    id: str
+    member_ids: FrozenSet[str]
+    # Máscara de bits dos membros sobre o bit_index do GameData da compilação
+    mask: int
+    payload: Dict[str, Any]
+    # Parte da pontuação do ranking que não depende da tier list (ver static_team_score)
+    static_score: float = 0.0
+
+
+def _populate_slot(slot_info_from_template, base_char_data, game_data, warn_missing_build=True):
+    """
+    Slot populado (formato de characters_in_team nas respostas) para o personagem
+    base_char_data, com a build do slot (de game_data) resolvida e seus
+    build_overrides aplicados.
+    """
+    char_id = base_char_data.get("id")
+    build_key = slot_info_from_template.get("build_key")
+    # Build indicada pelo template, ou a primeira build do personagem como default
+    resolved_build_details = get_character_build(
+        char_id, build_key, game_data) or {}
+    if warn_missing_build and build_key and resolved_build_details.get("key") != build_key:
+        print(
+            f"AVISO: Build com key '{build_key}' não encontrada para '{char_id}'. Usando a primeira build disponível.")
+
+    overrides = slot_info_from_template.get("build_overrides", {})
+    if overrides:
+        resolved_build_details = merge_build_overrides(
+            resolved_build_details, overrides)
+
+    return {
+        "id": base_char_data.get("id"),
+        "name": base_char_data.get("name"),
+        "icon_url": base_char_data.get("icon_url"),
+        "element_icon_url": base_char_data.get("element_icon_url"),
+        "element": base_char_data.get("element"),
+        "rarity": base_char_data.get("rarity"),
+        # Adicione outros campos base do personagem que a TeamDetailPage possa precisar
+        "role_in_team": slot_info_from_template.get("role_in_team", "Função não especificada"),
+        "build_key": build_key,
+        # Este agora é o objeto da build resolvido
+        "build_details": resolved_build_details
+    }
+
+
+def _template_base_payload(comp_template):
+    team_id = comp_template.get(
+        "id", comp_template.get("name", "team_") + str(uuid.uuid4()))
+    payload = dict(comp_template)
+    payload.update({
+        "id": team_id,
+        "name": comp_template.get("name", "Time Sugerido"),
+        "strategy": comp_template.get("strategy", "Estratégia não definida."),
+    })
+    return payload
+
+
+def _is_flex_template(comp_template):
+    """Template com ao menos um slot flexível: sem 'character_id', com 'criteria'."""
+    return any(isinstance(slot, dict) and not slot.get("character_id") and slot.get("criteria")
+               for slot in comp_template.get("characters_in_team", []))
+
+
+def compile_team_template(comp_template, game_data) -> Optional[CompiledTeam]:
+    """
+    Resolve um template de time em um CompiledTeam sobre os personagens de
+    game_data. Retorna None se o template não tiver 4 slots, se algum personagem
+    não existir ou se o template tiver slots flexíveis (esses são compilados por
+    compile_flex_template).
+    """
+    template_character_slots = comp_template.get("characters_in_team", [])
+    if len(template_character_slots) != 4:
+        print(
+            f"AVISO: Template de time '{comp_template.get('name')}' não tem 4 personagens, pulando.")
+        return None
+    if _is_flex_template(comp_template):
+        return None
+
+    all_characters_map = game_data.characters_map
+    populated_chars = []
+    for slot_info_from_template in template_character_slots:
+        char_id = slot_info_from_template.get("character_id")
+        base_char_data = all_characters_map.get(char_id) if char_id else None
+        if not base_char_data:
+            print(
+                f"AVISO: Personagem com ID '{char_id}' do template de time '{comp_template.get('name')}' não encontrado.")
+            return None
+        populated_chars.append(
+            _populate_slot(slot_info_from_template, base_char_data, game_data))
+
+    payload = _template_base_payload(comp_template)
+    payload["characters_in_team"] = populated_chars
+    member_ids = frozenset(char["id"] for char in populated_chars)
+    return CompiledTeam(
+        id=payload["id"],
+        member_ids=member_ids,
+        mask=build_roster_mask(member_ids, game_data.bit_index),
+        payload=payload,
+        static_score=static_team_score(populated_chars, {
+            char_id: _role_categories(all_characters_map[char_id]) for char_id in member_ids}))
+
+
+# --- Templates com slots flexíveis ---
+# Limites de times gerados por template flexível e por roster
+FLEX_MAX_TEAMS_PER_TEMPLATE = 20
+FLEX_MAX_TEAMS = 100
+# Máximo de candidatos testados na busca dos slots flexíveis por roster. Os
+# limites são só de contagem (e não de tempo) para que o resultado dependa apenas
+# do roster e possa ir para o cache de sugestões.
+FLEX_MAX_SEARCH_STEPS = 5000
+
+
+@dataclass(frozen=True)
+class FlexSlot:
+    """
+    Slot flexível de um template: os personagens que atendem a 'criteria'
+    (via _character_matches_criteria) são calculados uma vez, na compilação.
+    """
+    position: int
+    # Critérios serializados: slots com a mesma chave são intercambiáveis
+    criteria_key: str
+    # Máscara de bits (sobre o bit_index da compilação) dos candidatos
+    candidate_mask: int
+    # Bit do candidato -> slot populado, no mesmo formato dos slots fixos
+    payload_by_bit: Dict[int, Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class FlexTeamTemplate:
+    """
+    Template com slots flexíveis, preenchidos por roster em generate_flex_teams.
+    'slot_payloads' tem os slots fixos já populados e None nas posições flexíveis.
+    'display_payload' é o time genérico mostrado em /api/teams-for-character,
+    com cada slot flexível descrito por _flex_slot_payload.
+    """
+    id: str
+    fixed_mask: int
+    slot_payloads: tuple
+    flex_slots: tuple
+    base_payload: Dict[str, Any]
+    display_payload: Dict[str, Any]
+
+
+def _flex_slot_payload(position, slot_info_from_template, candidates):
+    """
+    Slot flexível ainda não preenchido: a função, os critérios do template e os
+    IDs dos personagens que os atendem, no lugar dos dados de um personagem.
+    """
+    role_in_team = slot_info_from_template.get("role_in_team", "Função não especificada")
+    return {
+        "id": f"flex_slot_{position + 1}",
+        "name": f"Flexível: {role_in_team}",
+        "icon_url": None,
+        "flex": True,
+        "role_in_team": role_in_team,
+        "criteria": slot_info_from_template.get("criteria") or {},
+        "candidate_ids": [char_data["id"] for char_data in candidates],
+        "build_details": {}
+    }
+
+
+def compile_flex_template(comp_template, game_data) -> Optional[FlexTeamTemplate]:
+    """
+    Resolve os slots fixos de um template flexível e pré-calcula os candidatos de
+    cada slot flexível. Retorna None se um personagem fixo não existir ou se algum
+    slot flexível não tiver nenhum candidato possível.
+    """
+    template_character_slots = comp_template.get("characters_in_team", [])
+    if len(template_character_slots) != 4:
+        print(
+            f"AVISO: Template de time '{comp_template.get('name')}' não tem 4 personagens, pulando.")
+        return None
+
+    all_characters_map, bit_index = game_data.characters_map, game_data.bit_index
+    fixed_ids = {slot.get("character_id") for slot in template_character_slots
+                 if slot.get("character_id")}
+    characters_by_id = sorted(all_characters_map.values(),
+                              key=lambda char_data: char_data["id"])
+    slot_payloads = []
+    display_slots = []
+    flex_slots = []
+    for position, slot_info_from_template in enumerate(template_character_slots):
+        char_id = slot_info_from_template.get("character_id")
+        if char_id:
+            base_char_data = all_characters_map.get(char_id)
+            if not base_char_data:
+                print(
+                    f"AVISO: Personagem com ID '{char_id}' do template de time '{comp_template.get('name')}' não encontrado.")
+                return None
+            slot_payloads.append(
+                _populate_slot(slot_info_from_template, base_char_data, game_data))
+            display_slots.append(slot_payloads[-1])
+            continue
+
+        criteria = slot_info_from_template.get("criteria") or {}
+        candidates = [char_data for char_data in characters_by_id
+                      if _character_matches_criteria(char_data, criteria, fixed_ids)]
+        if not candidates:
+            print(
+                f"AVISO: Nenhum personagem atende aos critérios do slot {position + 1} do template de time '{comp_template.get('name')}', pulando.")
+            return None
+        payload_by_bit = {bit_index[char_data["id"]]: _populate_slot(slot_info_from_template, char_data, game_data, warn_missing_build=False)
+                          for char_data in candidates}
+        slot_payloads.append(None)
+        display_slots.append(_flex_slot_payload(
+            position, slot_info_from_template, candidates))
+        flex_slots.append(FlexSlot(
+            position=position,
+            criteria_key=json.dumps(criteria, sort_keys=True),
+            candidate_mask=build_roster_mask(
+                (char_data["id"] for char_data in candidates), bit_index),
+            payload_by_bit=payload_by_bit))
+
+    base_payload = _template_base_payload(comp_template)
+    display_payload = dict(base_payload, characters_in_team=display_slots)
+    return FlexTeamTemplate(
+        id=base_payload["id"],
+        fixed_mask=build_roster_mask(fixed_ids, bit_index),
+        slot_payloads=tuple(slot_payloads),
+        flex_slots=tuple(flex_slots),
+        base_payload=base_payload,
+        display_payload=display_payload)
+
+
+@dataclass(frozen=True)
+class TeamMatchIndex:
+    """
+    Tudo o que uma requisição de sugestão consulta, montado de uma vez por
+    compile_team_match_index e publicado junto com os personagens sobre os quais
+    foi compilado, no campo team_match_index do GameData: uma recarga nunca expõe
+    times de uma compilação com índices de outra. Cada requisição deve ler o
+    GameData uma única vez e usar só esse objeto.
+    """
+    # Índice do template em 'compositions' -> CompiledTeam
+    compiled_teams: Dict[int, CompiledTeam]
+    # Os mesmos times pré-compilados, indexados pelo 'id' do template
+    compiled_teams_by_id: Dict[str, CompiledTeam]
+    # Cada time compilado aparece na lista de um único membro "âncora" (o que está
+    # em menos templates), para que uma requisição visite cada candidato uma só vez.
+    compiled_teams_by_anchor: Dict[str, list]
+    # Matriz (times x palavras de 64 bits) com as máscaras dos times, para NumPy,
+    # e o índice do template correspondente a cada linha.
+    mask_matrix: Any
+    matrix_indices: tuple
+    # bit_index usado nas máscaras dos times; as máscaras dos rosters precisam
+    # ser montadas com o mesmo índice
+    bit_index: Dict[str, int]
+    # Templates com slots flexíveis (FlexTeamTemplate), na ordem de 'compositions'
+    flex_templates: tuple = ()
+    # Templates de team_data/, na ordem de carregamento
+    compositions: tuple = ()
+    # Índice invertido: character_id -> índices (em 'compositions') dos templates que o exigem
+    compositions_by_character: Dict[str, list] = field(default_factory=dict)
+    # Arquivos de team_data/ carregados: nome sem extensão -> (mtime_ns, [índices em 'compositions'])
+    composition_files: Dict[str, tuple] = field(default_factory=dict)
+    # Times populados por arquivo de team_data/ (rota /api/teams-for-character),
+    # incluindo o display_payload dos templates flexíveis:
+    # nome sem extensão -> (mtime_ns do arquivo quando foi lido, [payloads])
+    teams_by_character_file: Dict[str, tuple] = field(default_factory=dict)
+
+    def roster_mask(self, character_ids):
+        return build_roster_mask(character_ids, self.bit_index)
+
+
+EMPTY_TEAM_MATCH_INDEX = TeamMatchIndex({}, {}, {}, None, (), {})
+
+
+def get_team_match_index(game_data=None):
+    """TeamMatchIndex de game_data (GAME_DATA por padrão)."""
+    game_data = game_data or get_game_data()
+    return game_data.team_match_index or EMPTY_TEAM_MATCH_INDEX
+
+
+def _split_mask_words(mask, word_count):
+    return [(mask >> (64 * word)) & 0xFFFFFFFFFFFFFFFF for word in range(word_count)]
+
+
+def _mask_word_count(bit_index):
+    return max(1, (len(bit_index) + 63) // 64)
+
+
+def compile_team_match_index(compositions, composition_files, game_data):
+    """
+    Pré-compila os templates de 'compositions' sobre os personagens de game_data
+    e monta os índices de casamento por máscara de bits. 'composition_files' é
+    {nome do arquivo sem extensão: (mtime_ns, [índices em compositions])}. Sem
+    personagens carregados, os times compilados ficam vazios.
+    """
+    bit_index = game_data.bit_index
+    compositions_by_character = _build_compositions_index(compositions)
+    compiled_teams = {}
+    compiled_teams_by_id = {}
+    compiled_teams_by_anchor = {}
+    flex_templates_by_idx = {}
+    if game_data.characters_map:
+        for idx, comp_template in enumerate(compositions):
+            if _is_flex_template(comp_template):
+                flex_template = compile_flex_template(comp_template, game_data)
+                if flex_template:
+                    flex_templates_by_idx[idx] = flex_template
+                continue
+            compiled_team = compile_team_template(comp_template, game_data)
+            if compiled_team:
+                compiled_teams[idx] = compiled_team
+                compiled_teams_by_id.setdefault(
+                    compiled_team.id, compiled_team)
+                anchor_id = min(sorted(compiled_team.member_ids), key=lambda char_id: len(
+                    compositions_by_character.get(char_id, ())))
+                compiled_teams_by_anchor.setdefault(anchor_id, []).append(idx)
+
+    matrix_indices = tuple(compiled_teams)
+    mask_matrix = None
+    if np is not None and matrix_indices:
+        word_count = _mask_word_count(bit_index)
+        mask_matrix = np.array([_split_mask_words(compiled_teams[idx].mask, word_count)
+                                for idx in matrix_indices], dtype=np.uint64)
+
+    display_payloads = {idx: compiled_team.payload for idx, compiled_team in compiled_teams.items()}
+    display_payloads.update((idx, flex_template.display_payload)
+                            for idx, flex_template in flex_templates_by_idx.items())
+    teams_by_character_file = {
+        file_key: (file_mtime, [display_payloads[idx] for idx in template_indices if idx in display_payloads])
+        for file_key, (file_mtime, template_indices) in composition_files.items()}
+    flex_templates = list(flex_templates_by_idx.values())
+
+    if compiled_teams:
+        print(
+            f"INFO: Total de {len(compiled_teams)} times pré-compilados.")
+    if flex_templates:
+        print(
+            f"INFO: Total de {len(flex_templates)} templates com slots flexíveis.")
+    return TeamMatchIndex(
+        compiled_teams=compiled_teams,
+        compiled_teams_by_id=compiled_teams_by_id,
+        compiled_teams_by_anchor=compiled_teams_by_anchor,
+        mask_matrix=mask_matrix,
+        matrix_indices=matrix_indices,
+        bit_index=bit_index,
+        flex_templates=tuple(flex_templates),
+        compositions=tuple(compositions),
+        compositions_by_character=compositions_by_character,
+        composition_files=composition_files,
+        teams_by_character_file=teams_by_character_file)
+
+
+def find_formable_team_indices(match_index, roster_mask, owned_character_ids):
+    """
+    Retorna, em ordem, os índices dos times compilados formáveis com o roster.
+    Só visita os times ancorados em personagens possuídos; cada um é testado com
+    um único AND/compare da sua máscara contra roster_mask.
+    """
+    compiled_teams = match_index.compiled_teams
+    anchors = match_index.compiled_teams_by_anchor
+    formable_indices = []
+    for char_id in owned_character_ids:
+        for idx in anchors.get(char_id, ()):
+            team_mask = compiled_teams[idx].mask
+            if team_mask & roster_mask == team_mask:
+                formable_indices.append(idx)
+    formable_indices.sort()
+    return formable_indices
 
 
-# Carrega as composições de times quando o módulo é importado
-load_defined_compositions()
+def match_rosters_to_teams(match_index, roster_masks):
+    """
+    Casa vários rosters (máscaras de bits) contra todos os times compilados de uma
+    vez. Retorna, para cada roster, a lista ordenada de índices de times formáveis.
+    Com NumPy, o casamento é uma única operação vetorizada rosters x times.
+    """
+    if not roster_masks:
+        return []
+    mask_matrix = match_index.mask_matrix
+    matrix_indices = match_index.matrix_indices
+    if mask_matrix is None:
+        compiled_teams = match_index.compiled_teams
+        return [[idx for idx in matrix_indices
+                 if compiled_teams[idx].mask & roster_mask == compiled_teams[idx].mask]
+                for roster_mask in roster_masks]
+
+    word_count = mask_matrix.shape[1]
+    rosters_matrix = np.array([_split_mask_words(roster_mask, word_count)
+                               for roster_mask in roster_masks], dtype=np.uint64)
+    formable = ((rosters_matrix[:, None, :] & mask_matrix[None, :, :])
+                == mask_matrix[None, :, :]).all(axis=2)
+    return [[matrix_indices[col] for col in np.flatnonzero(row)] for row in formable]
+
+
+def _flex_team_payload(flex_template, open_slots, chosen_bits):
+    characters_in_team = list(flex_template.slot_payloads)
+    for (_, _, flex_slot, _), bit in zip(open_slots, chosen_bits):
+        characters_in_team[flex_slot.position] = flex_slot.payload_by_bit[bit]
+    flex_member_ids = [characters_in_team[flex_slot.position]["id"]
+                       for flex_slot in flex_template.flex_slots]
+    payload = dict(flex_template.base_payload)
+    payload["id"] = f"{flex_template.id}:{'+'.join(flex_member_ids)}"
+    payload["characters_in_team"] = characters_in_team
+    return payload
+
+
+def _fill_flex_slots(flex_template, roster_mask, seen_member_masks, max_teams, search_steps):
+    """
+    Enumera os preenchimentos dos slots flexíveis com personagens do roster, em
+    busca em profundidade: slots mais seletivos primeiro, bits crescentes entre
+    slots intercambiáveis (sem permutações) e corte assim que algum slot restante
+    fica sem candidatos. Conjuntos de membros já vistos são ignorados. Cada
+    candidato testado consome um passo de search_steps ([passos restantes],
+    compartilhado entre os templates de um roster).
+    """
+    open_slots = []
+    for flex_slot in flex_template.flex_slots:
+        candidate_mask = flex_slot.candidate_mask & roster_mask & ~flex_template.fixed_mask
+        if not candidate_mask:
+            return []
+        open_slots.append((candidate_mask.bit_count(), flex_slot.criteria_key,
+                           flex_slot, candidate_mask))
+    open_slots.sort(key=lambda open_slot: open_slot[:2])
+
+    teams = []
+    chosen_bits = [0] * len(open_slots)
+
+    def assign(depth, used_mask):
+        if depth == len(open_slots):
+            if used_mask not in seen_member_masks:
+                seen_member_masks.add(used_mask)
+                teams.append(_flex_team_payload(
+                    flex_template, open_slots, chosen_bits))
+            return
+        _, criteria_key, _, candidate_mask = open_slots[depth]
+        available = candidate_mask & ~used_mask
+        if depth and open_slots[depth - 1][1] == criteria_key:
+            available &= ~((1 << (chosen_bits[depth - 1] + 1)) - 1)
+        while available and len(teams) < max_teams and search_steps[0] > 0:
+            search_steps[0] -= 1
+            lowest_bit = available & -available
+            available ^= lowest_bit
+            next_used_mask = used_mask | lowest_bit
+            if all(later_slot[3] & ~next_used_mask for later_slot in open_slots[depth + 1:]):
+                chosen_bits[depth] = lowest_bit.bit_length() - 1
+                assign(depth + 1, next_used_mask)
+
+    assign(0, flex_template.fixed_mask)
+    return teams
+
+
+def generate_flex_teams(match_index, roster_mask, excluded_member_masks=()):
+    """
+    Times dos templates flexíveis formáveis com o roster: os slots fixos precisam
+    estar no roster e os flexíveis são preenchidos com os personagens possuídos
+    que atendem aos critérios. Limitado a FLEX_MAX_TEAMS times e a
+    FLEX_MAX_SEARCH_STEPS candidatos testados; times com os mesmos membros de um
+    time em excluded_member_masks (ou de outro já gerado) não são repetidos.
+    """
+    search_steps = [FLEX_MAX_SEARCH_STEPS]
+    seen_member_masks = set(excluded_member_masks)
+    teams = []
+    for flex_template in match_index.flex_templates:
+        remaining_teams = FLEX_MAX_TEAMS - len(teams)
+        if remaining_teams <= 0 or search_steps[0] <= 0:
+            break
+        if flex_template.fixed_mask & roster_mask != flex_template.fixed_mask:
+            continue
+        teams.extend(_fill_flex_slots(flex_template, roster_mask, seen_member_masks,
+                                      min(remaining_teams, FLEX_MAX_TEAMS_PER_TEMPLATE), search_steps))
+    return teams
+
+
+# Arquivos de team_data/ alterados desde a última carga e recompilados sob
+# demanda: (versão do GameData, nome sem extensão) -> (mtime_ns, [payloads])
+_RECOMPILED_TEAM_FILES = {}
+
+
+def get_teams_for_character(character_id):
+    """
+    Times populados do arquivo team_data/<character_id>.json, servidos do
+    TeamMatchIndex atual. Templates flexíveis aparecem com os slots fixos
+    populados e os flexíveis descritos por _flex_slot_payload. O arquivo só é
+    relido e recompilado quando o seu mtime difere do da carga; um arquivo
+    inexistente resulta em lista vazia.
+    """
+    game_data = get_game_data()
+    file_key, team_file_path = get_team_file_path(character_id)
+    try:
+        file_mtime = os.stat(team_file_path).st_mtime_ns
+    except OSError:
+        return []
+
+    cached_entry = get_team_match_index(game_data).teams_by_character_file.get(file_key)
+    if not (cached_entry and cached_entry[0] == file_mtime):
+        cached_entry = _RECOMPILED_TEAM_FILES.get((game_data.version, file_key))
+    if cached_entry and cached_entry[0] == file_mtime:
+        return cached_entry[1]
+
+    populated_teams = []
+    for comp_template in get_teams_for_character_from_file(character_id):
+        if _is_flex_template(comp_template):
+            flex_template = compile_flex_template(comp_template, game_data)
+            if flex_template:
+                populated_teams.append(flex_template.display_payload)
+            continue
+        compiled_team = compile_team_template(comp_template, game_data)
+        if compiled_team:
+            populated_teams.append(compiled_team.payload)
+    # Entradas de versões anteriores dos dados não servem mais
+    for stale_key in [key for key in _RECOMPILED_TEAM_FILES if key[0] != game_data.version]:
+        _RECOMPILED_TEAM_FILES.pop(stale_key, None)
+    _RECOMPILED_TEAM_FILES[(game_data.version, file_key)] = (
+        file_mtime, populated_teams)
+    return populated_teams
 
 
 def _character_matches_criteria(character_obj, criteria, current_team_ids_being_built):
-    # (Mantenha esta função helper como na resposta #25 - para preencher flex slots se você usar essa lógica)
-    # Por agora, a lógica principal abaixo assume que `characters_in_team` no template já define os 4.
+    # Usada por compile_flex_template para calcular os candidatos de cada slot flexível
     if character_obj['id'] in current_team_ids_being_built:
         return False
     if "character_id_options" in criteria and character_obj['id'] not in criteria["character_id_options"]:
@@ -73,103 +693,125 @@ def _character_matches_criteria(character_obj, criteria, current_team_ids_being_
     return True
 
 
-def generate_teams_from_owned(owned_character_ids_set, all_characters_info_list):
-    suggested_teams_output = []
+def _characters_by_id(all_characters_info_list):
+    # Mapa de todos os personagens (com suas build_options) para busca rápida por ID
+    return {char['id']: char for char in all_characters_info_list if 'id' in char}
 
-    # Criar um mapa de todos os personagens (com suas build_options) para busca rápida por ID
-    all_chars_map_with_builds = {
-        char['id']: char for char in all_characters_info_list if 'id' in char}
 
-    # Filtrar para obter os objetos completos apenas dos personagens que o usuário possui
-    owned_character_objects = [all_chars_map_with_builds[char_id]
-                               for char_id in owned_character_ids_set if char_id in all_chars_map_with_builds]
+def _owned_character_objects(owned_character_ids_set, all_chars_map_with_builds):
+    # Objetos completos apenas dos personagens que o usuário possui
+    return [all_chars_map_with_builds[char_id]
+            for char_id in owned_character_ids_set if char_id in all_chars_map_with_builds]
 
-    if not owned_character_objects:
-        return [{"error": "Nenhum personagem válido fornecido ou encontrado nos dados gerais."}]
 
-    # 1. Tentar corresponder às composições definidas em DEFINED_COMPOSITIONS
-    for comp_template in DEFINED_COMPOSITIONS:
-        template_character_slots = comp_template.get("characters_in_team", [])
+# --- Fallback: melhor quarteto do roster quando nenhum template é formável ---
+# Categorias de função (por palavras-chave do campo 'role', que é texto livre) e
+# o peso de cada uma na pontuação de cobertura do time
+FALLBACK_ROLE_CATEGORY_KEYWORDS = (
+    ("sustain", ("healer", "shield", "curand", "escud")),
+    ("sub_dps", ("off-field", "sub-dps", "quickswap")),
+    ("support", ("support", "suporte", "buffer", "enabler", "battery", "aplicador")),
+    ("dps", ("dps", "driver", "hypercarry")),
+)
+FALLBACK_ROLE_CATEGORY_WEIGHTS = {
+    "dps": 3, "sustain": 2, "support": 1, "sub_dps": 1}
+# Acima deste número de quartetos possíveis, avalia uma amostra desse tamanho
+FALLBACK_MAX_QUARTETS = 5000
 
-        if len(template_character_slots) != 4:  # Pular templates malformados ou incompletos
-            # print(f"DEBUG: Template {comp_template.get('name')} pulado, não tem 4 personagens em characters_in_team.")
-            continue
 
-        team_is_formable = True
-        current_team_populated_chars = []
+def _role_categories(char_obj):
+    categories = set()
+    for role in char_obj.get("role") or []:
+        role_lower = str(role).lower()
+        for category, keywords in FALLBACK_ROLE_CATEGORY_KEYWORDS:
+            if any(keyword in role_lower for keyword in keywords):
+                categories.add(category)
+                break
+    return categories
 
-        for slot_info_from_template in template_character_slots:
-            char_id = slot_info_from_template.get("character_id")
 
-            if not (char_id and char_id in owned_character_ids_set and char_id in all_chars_map_with_builds):
-                # Personagem do template não possuído ou não encontrado nos dados gerais
-                team_is_formable = False
-                break
+def _quartet_score(quartet, categories_by_id):
+    """
+    (cobertura de funções, variedade de elementos): pesos das categorias cobertas
+    menos 1 por DPS principal repetido; até 3 elementos distintos, +1 se houver
+    um par de ressonância.
+    """
+    covered_categories = set()
+    dps_count = 0
+    for char_obj in quartet:
+        char_categories = categories_by_id[char_obj["id"]]
+        covered_categories |= char_categories
+        dps_count += "dps" in char_categories
+    role_score = sum(FALLBACK_ROLE_CATEGORY_WEIGHTS[category]
+                     for category in covered_categories) - max(0, dps_count - 1)
+    element_counts = Counter(char_obj.get("element") for char_obj in quartet)
+    element_score = min(len(element_counts), 3) + \
+        (1 if max(element_counts.values()) >= 2 else 0)
+    return role_score, element_score
 
-            base_char_data = all_chars_map_with_builds[char_id]
-            resolved_build_details = {}  # Começa vazio
-
-            build_key_from_template = slot_info_from_template.get("build_key")
-            character_build_options = base_char_data.get("build_options", [])
-
-            if build_key_from_template and character_build_options:
-                found_build = next((b for b in character_build_options if b.get(
-                    "key") == build_key_from_template), None)
-                if found_build:
-                    # Contém name, artifacts, weapons, etc. da build
-                    resolved_build_details = found_build
-                else:
-                    # print(f"AVISO: Build key '{build_key_from_template}' não encontrada para {char_id} no template '{comp_template.get('name')}'. Usando primeira build se disponível.")
-                    if character_build_options:  # Pega a primeira build como default se a chave não for encontrada
-                        resolved_build_details = character_build_options[0]
-            elif character_build_options:  # Se não há build_key no template, pega a primeira build do personagem como default
-                # print(f"AVISO: Nenhuma build_key especificada para {char_id} no template '{comp_template.get('name')}'. Usando primeira build se disponível.")
-                resolved_build_details = character_build_options[0]
-            # else:
-                # print(f"AVISO: Nenhuma build_options encontrada para {char_id} ou nenhuma build_key especificada e sem default.")
-                # resolved_build_details permanecerá {} se nenhuma build for encontrada/definida
-
-            # Aplicar build_overrides (simplificado por enquanto)
-            # Para uma implementação completa, você precisaria de um merge profundo aqui.
-            overrides = slot_info_from_template.get("build_overrides", {})
-            if overrides:
-                # Exemplo simples: se 'notes_override' existir, adiciona/substitui uma nota na build
-                if "notes_override" in overrides:
-                    # Adiciona se não existir
-                    if not resolved_build_details.get("notes_build"):
-                        resolved_build_details["notes_build"] = ""
-                    resolved_build_details["notes_build"] += " (Time Específico: " + \
-                        overrides["notes_override"] + ")"
-                # Você pode expandir para outros campos como main_stats, weapons, etc.
-
-            populated_char_info = {
-                "id": base_char_data.get("id"),
-                "name": base_char_data.get("name"),
-                "icon_url": base_char_data.get("icon_url"),
-                "element_icon_url": base_char_data.get("element_icon_url"),
-                "element": base_char_data.get("element"),
-                "rarity": base_char_data.get("rarity"),
-                # Adicione outros campos base do personagem que a TeamDetailPage possa precisar
-                "role_in_team": slot_info_from_template.get("role_in_team", "Função não especificada"),
-                # Este agora é o objeto da build resolvido
-                "build_details": resolved_build_details
-            }
-            current_team_populated_chars.append(populated_char_info)
-
-        if team_is_formable and len(current_team_populated_chars) == 4:
-            suggested_teams_output.append({
-                # Substitua random.randint por uuid.uuid4() para gerar um ID único e seguro
-                "id": comp_template.get("id", comp_template.get("name", "team_") + str(uuid.uuid4())),
-                "name": comp_template.get("name", "Time Sugerido"),
-                "strategy": comp_template.get("strategy", "Estratégia não definida."),
-                "characters_in_team": current_team_populated_chars
-            })
 
-    # 2. Fallback: Time aleatório se nenhuma composição definida for encontrada
+def _best_fallback_quartet(owned_character_objects, rng):
+    """
+    Quarteto de maior pontuação entre os personagens possuídos. Enumera todas as
+    combinações quando são no máximo FALLBACK_MAX_QUARTETS; caso contrário,
+    avalia uma amostra desse tamanho sorteada por 'rng'. Empates são decididos
+    por 'rng', então o resultado só depende do roster e da semente.
+    """
+    candidates = sorted(owned_character_objects,
+                        key=lambda char_obj: char_obj["id"])
+    categories_by_id = {char_obj["id"]: _role_categories(char_obj)
+                        for char_obj in candidates}
+    if comb(len(candidates), 4) <= FALLBACK_MAX_QUARTETS:
+        quartets = combinations(candidates, 4)
+    else:
+        quartets = (rng.sample(candidates, 4)
+                    for _ in range(FALLBACK_MAX_QUARTETS))
+    best_quartet = max(quartets, key=lambda quartet: (
+        _quartet_score(quartet, categories_by_id), rng.random()))
+    # DPS primeiro, sustain por último; IDs como desempate para ordem estável
+    category_order = ("dps", "sub_dps", "support", "sustain")
+    return sorted(best_quartet, key=lambda char_obj: (
+        min((category_order.index(category) for category in categories_by_id[char_obj["id"]]),
+            default=len(category_order)),
+        char_obj["id"]))
+
+
+def _fallback_rng(owned_character_objects, seed):
+    # Mesmo roster e mesma semente -> mesma sequência; outra semente varia o time
+    seed_bytes = roster_fingerprint(
+        char_obj["id"] for char_obj in owned_character_objects)
+    if seed is not None:
+        seed_bytes += str(seed).encode('utf-8')
+    return random.Random(seed_bytes)
+
+
+def _build_suggestions(match_index, owned_character_objects, formable_team_indices, seed=None):
+    """
+    Monta a resposta de sugestão de um roster a partir dos índices dos times
+    formáveis já encontrados, aplicando o fallback e as mensagens de resultado.
+    Retorna (sugestões, usou o fallback?); só com o fallback o resultado depende
+    de 'seed', e é determinístico para um mesmo roster e 'seed'.
+    """
+    if not owned_character_objects:
+        return [{"error": "Nenhum personagem válido fornecido ou encontrado nos dados gerais."}], False
+
+    # 1. Composições definidas em team_data/ que o roster consegue formar
+    compiled_teams = match_index.compiled_teams
+    suggested_teams_output = [compiled_teams[template_idx].payload
+                              for template_idx in formable_team_indices]
+    # Times dos templates com slots flexíveis, preenchidos com o roster
+    if match_index.flex_templates:
+        suggested_teams_output.extend(generate_flex_teams(
+            match_index,
+            match_index.roster_mask(char_obj["id"]
+                                    for char_obj in owned_character_objects),
+            {compiled_teams[template_idx].mask for template_idx in formable_team_indices}))
+
+    # 2. Fallback: melhor quarteto do roster se nenhuma composição definida for encontrada
     if not suggested_teams_output and len(owned_character_objects) >= 4:
-        random.shuffle(owned_character_objects)
+        rng = _fallback_rng(owned_character_objects, seed)
         team_for_random_display = []
-        for char_obj in owned_character_objects[:4]:
+        for char_obj in _best_fallback_quartet(owned_character_objects, rng):
             default_build = {}
             if char_obj.get("build_options") and len(char_obj["build_options"]) > 0:
                 # Pega a primeira build como default
@@ -183,11 +825,12 @@ def generate_teams_from_owned(owned_character_ids_set, all_characters_info_list)
             })
 
         suggested_teams_output.append({
-            "id": "random_team_" + str(secrets.randbelow(9000) + 1000),
+            "id": "random_team_" + str(rng.randrange(1000, 10000)),
             "name": "Time Aleatório Sugerido",
             "characters_in_team": team_for_random_display,
-            "strategy": "Um time gerado aleatoriamente com seus personagens. As builds mostradas são as primeiras definidas para cada um (se disponíveis)."
+            "strategy": "Um time montado com seus personagens priorizando a cobertura de funções (DPS, sustain, suporte) e a variedade de elementos. As builds mostradas são as primeiras definidas para cada um (se disponíveis)."
         })
+        return suggested_teams_output, True
 
     # 3. Mensagens de resultado
     if not suggested_teams_output:
@@ -197,8 +840,274 @@ def generate_teams_from_owned(owned_character_ids_set, all_characters_info_list)
                 "name"), "icon_url": c.get("icon_url")} for c in owned_character_objects]
             return [{"error": "Personagens Insuficientes",
                      "message": f"Você selecionou {len(owned_character_objects)}. São necessários 4 para um time.",
-                     "characters": error_chars_display}]
+                     "characters": error_chars_display}], False
         else:
-            return [{"message": "Não foi possível encontrar composições específicas ou gerar um time aleatório com os personagens selecionados."}]
+            return [{"message": "Não foi possível encontrar composições específicas ou gerar um time aleatório com os personagens selecionados."}], False
+
+    return suggested_teams_output, False
+
+
+# --- Cache de sugestões por roster ---
+# Número máximo de rosters em cache (LRU); 0 desativa o cache
+SUGGESTION_CACHE_MAX_ENTRIES = int(os.getenv('SUGGESTION_CACHE_SIZE', '4096'))
+# (versão dos dados do jogo, impressão digital do roster) -> sugestões, do uso
+# menos recente para o mais recente. As listas são compartilhadas entre
+# requisições e não devem ser modificadas. Rosters resolvidos pelo fallback (o
+# único caso que depende da semente) guardam _SEED_DEPENDENT nessa chave e as
+# sugestões em (versão, impressão digital, semente).
+SUGGESTION_CACHE = OrderedDict()
+_SEED_DEPENDENT = object()
+SUGGESTION_CACHE_STATS = {"hits": 0, "misses": 0, "evictions": 0}
+# Versão dos dados das entradas atuais: ao mudar, o cache inteiro é descartado
+_SUGGESTION_CACHE_VERSION = None
+_SUGGESTION_CACHE_LOCK = threading.Lock()
+
+
+def roster_fingerprint(owned_character_ids):
+    """Hash dos IDs possuídos (em ordem), independente da ordem de entrada."""
+    sorted_ids = sorted(char_id for char_id in owned_character_ids
+                        if isinstance(char_id, str))
+    return hashlib.blake2b("\x1f".join(sorted_ids).encode('utf-8'), digest_size=16).digest()
+
+
+def _suggestion_cache_key(game_data, owned_character_ids):
+    return (game_data.version, roster_fingerprint(owned_character_ids))
+
+
+def _discard_stale_suggestions():
+    # Chamada com o lock: descarta tudo se os dados do jogo foram recarregados
+    global _SUGGESTION_CACHE_VERSION
+    current_version = get_game_data_version()
+    if _SUGGESTION_CACHE_VERSION != current_version:
+        SUGGESTION_CACHE.clear()
+        RANKED_SUGGESTION_CACHE.clear()
+        _SUGGESTION_CACHE_VERSION = current_version
+
+
+def _get_cached_suggestions(cache_key, seed=None):
+    if SUGGESTION_CACHE_MAX_ENTRIES <= 0:
+        return None
+    with _SUGGESTION_CACHE_LOCK:
+        _discard_stale_suggestions()
+        suggestions = SUGGESTION_CACHE.get(cache_key)
+        if suggestions is _SEED_DEPENDENT:
+            SUGGESTION_CACHE.move_to_end(cache_key)
+            cache_key = cache_key + (seed,)
+            suggestions = SUGGESTION_CACHE.get(cache_key)
+        if suggestions is None:
+            SUGGESTION_CACHE_STATS["misses"] += 1
+        else:
+            SUGGESTION_CACHE.move_to_end(cache_key)
+            SUGGESTION_CACHE_STATS["hits"] += 1
+        return suggestions
+
+
+def _store_suggestions(cache_key, suggestions, seed_dependent=False, seed=None):
+    if SUGGESTION_CACHE_MAX_ENTRIES <= 0:
+        return
+    with _SUGGESTION_CACHE_LOCK:
+        _discard_stale_suggestions()
+        # Calculada antes de uma recarga concluída durante a requisição: não guarda
+        if cache_key[0] != _SUGGESTION_CACHE_VERSION:
+            return
+        if seed_dependent:
+            SUGGESTION_CACHE[cache_key] = _SEED_DEPENDENT
+            SUGGESTION_CACHE.move_to_end(cache_key)
+            cache_key = cache_key + (seed,)
+        SUGGESTION_CACHE[cache_key] = suggestions
+        SUGGESTION_CACHE.move_to_end(cache_key)
+        while len(SUGGESTION_CACHE) > SUGGESTION_CACHE_MAX_ENTRIES:
+            SUGGESTION_CACHE.popitem(last=False)
+            SUGGESTION_CACHE_STATS["evictions"] += 1
+
+
+def get_suggestion_cache_stats():
+    with _SUGGESTION_CACHE_LOCK:
+        stats = dict(SUGGESTION_CACHE_STATS)
+        stats["size"] = len(SUGGESTION_CACHE)
+    lookups = stats["hits"] + stats["misses"]
+    stats["max_entries"] = SUGGESTION_CACHE_MAX_ENTRIES
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else None
+    stats["game_data_version"] = get_game_data_version()
+    return stats
+
+
+# --- Ranking das sugestões (top-K) ---
+# Página padrão e máxima de times devolvidos por roster
+DEFAULT_SUGGESTION_LIMIT = 50
+MAX_SUGGESTION_LIMIT = 200
+# Peso de cada componente da pontuação de um time
+TEAM_SCORE_WEIGHTS = {"tier": 1.0, "roles": 0.5, "builds": 1.0}
+# Nota (escala 0-5 de average_numeric_tier) de personagens fora da tier list
+TEAM_SCORE_MISSING_TIER = 2.5
+
+
+# Pontuações já calculadas, do uso menos recente para o mais recente:
+# (id da lista de sugestões, geração da tier list) -> (lista de sugestões,
+# pontuação de cada time em array('d'), prefixo da ordem do ranking em
+# array('I') com os índices dos times). As listas vêm do cache de sugestões (uma
+# por chave versão + roster + semente) e ficam referenciadas aqui, então o id
+# não é reutilizado enquanto a entrada existir; nenhuma cópia dos times é
+# guardada. Compartilha o lock e o limite de SUGGESTION_CACHE e é descartado
+# junto com ele a cada recarga dos dados.
+RANKED_SUGGESTION_CACHE = OrderedDict()
+
+
+def _tier_average(member_ids, tier_scores):
+    return sum(tier_scores.get(char_id, TEAM_SCORE_MISSING_TIER)
+               for char_id in member_ids) / len(member_ids)
+
+
+def static_team_score(members, categories_by_id):
+    """
+    Parte da pontuação que não depende da tier list: cobertura de funções (a
+    mesma do fallback) e fração dos slots com build disponível, com os pesos de
+    TEAM_SCORE_WEIGHTS. Pré-calculada em CompiledTeam.static_score.
+    """
+    role_score, _ = _quartet_score(members, categories_by_id)
+    build_ratio = sum(
+        1 for member in members if member.get("build_details")) / len(members)
+    return (TEAM_SCORE_WEIGHTS["roles"] * role_score
+            + TEAM_SCORE_WEIGHTS["builds"] * build_ratio)
+
+
+def score_team(team, tier_scores, categories_by_id):
+    """
+    Pontuação de um time sugerido: média do average_numeric_tier dos membros
+    (com TEAM_SCORE_WEIGHTS["tier"]) somada a static_team_score.
+    """
+    members = team["characters_in_team"]
+    return (TEAM_SCORE_WEIGHTS["tier"] * _tier_average([member["id"] for member in members], tier_scores)
+            + static_team_score(members, categories_by_id))
+
+
+def _team_scores(teams, tier_scores, game_data):
+    """
+    score_team de cada time, na ordem de 'teams'. Times pré-compilados usam o
+    static_score da compilação; só os demais (flexíveis e fallback) têm as
+    funções e builds avaliadas aqui.
+    """
+    compiled_teams_by_id = get_team_match_index(game_data).compiled_teams_by_id
+    all_characters_map = game_data.characters_map
+    categories_by_id = {}
+    scores = array('d')
+    for team in teams:
+        compiled_team = compiled_teams_by_id.get(team["id"])
+        if compiled_team is not None and compiled_team.payload is team:
+            score = (TEAM_SCORE_WEIGHTS["tier"] * _tier_average(compiled_team.member_ids, tier_scores)
+                     + compiled_team.static_score)
+        else:
+            for member in team["characters_in_team"]:
+                if member["id"] not in categories_by_id:
+                    categories_by_id[member["id"]] = _role_categories(
+                        all_characters_map.get(member["id"], member))
+            score = score_team(team, tier_scores, categories_by_id)
+        scores.append(score)
+    return scores
+
+
+def _top_team_indices(scores, count):
+    """
+    Índices dos 'count' times de maior pontuação, do maior para o menor (empates
+    mantêm a ordem original), com um heap limitado a 'count' itens.
+    """
+    return array('I', heapq.nlargest(count, range(len(scores)), key=scores.__getitem__))
+
+
+def rank_suggested_teams(suggested_teams, tier_scores=None, limit=DEFAULT_SUGGESTION_LIMIT, offset=0,
+                         tier_generation=None, game_data=None):
+    """
+    Página [offset, offset + limit) dos times sugeridos, do maior para o menor
+    score_team; só os times da página são copiados, com o campo 'score'. Com
+    'tier_generation' (a geração da tier list de 'tier_scores'), as pontuações e
+    a ordem até a página pedida ficam em RANKED_SUGGESTION_CACHE e as páginas
+    seguintes do mesmo roster não pontuam nada de novo. 'game_data' deve ser o
+    mesmo GameData usado para gerar as sugestões (GAME_DATA por padrão).
+    Respostas de erro/mensagem (sem 'characters_in_team') são devolvidas sem
+    alteração.
+    """
+    if not all(team.get("characters_in_team") for team in suggested_teams):
+        return suggested_teams
+    needed = min(offset + limit, len(suggested_teams))
+    use_cache = tier_generation is not None and SUGGESTION_CACHE_MAX_ENTRIES > 0
+    cache_key = (id(suggested_teams), tier_generation)
+    scores = order = None
+    if use_cache:
+        with _SUGGESTION_CACHE_LOCK:
+            _discard_stale_suggestions()
+            cached_entry = RANKED_SUGGESTION_CACHE.get(cache_key)
+            if cached_entry is not None and cached_entry[0] is suggested_teams:
+                RANKED_SUGGESTION_CACHE.move_to_end(cache_key)
+                _, scores, order = cached_entry
+    if scores is None:
+        scores = _team_scores(suggested_teams, tier_scores or {}, game_data or get_game_data())
+    if order is None or len(order) < needed:
+        order = _top_team_indices(scores, needed)
+        if use_cache:
+            with _SUGGESTION_CACHE_LOCK:
+                RANKED_SUGGESTION_CACHE[cache_key] = (suggested_teams, scores, order)
+                RANKED_SUGGESTION_CACHE.move_to_end(cache_key)
+                while len(RANKED_SUGGESTION_CACHE) > SUGGESTION_CACHE_MAX_ENTRIES:
+                    RANKED_SUGGESTION_CACHE.popitem(last=False)
+    return [dict(suggested_teams[index], score=round(scores[index], 2))
+            for index in order[offset:needed]]
+
+
+def generate_teams_from_owned(owned_character_ids_set, all_characters_info_list, seed=None, game_data=None):
+    """
+    Sugestões para um roster. 'seed' (int ou str, opcional) só afeta o time do
+    fallback: a mesma semente sempre gera o mesmo time para o mesmo roster.
+    'game_data' (GAME_DATA por padrão) deve ser o GameData de onde veio
+    'all_characters_info_list'.
+    """
+    game_data = game_data or get_game_data()
+    cache_key = _suggestion_cache_key(game_data, owned_character_ids_set)
+    cached_suggestions = _get_cached_suggestions(cache_key, seed)
+    if cached_suggestions is not None:
+        return cached_suggestions
+
+    all_chars_map_with_builds = _characters_by_id(all_characters_info_list)
+    owned_character_objects = _owned_character_objects(
+        owned_character_ids_set, all_chars_map_with_builds)
+
+    # Compara a máscara de bits do roster com a de cada time candidato
+    match_index = get_team_match_index(game_data)
+    valid_owned_ids = [char_obj["id"] for char_obj in owned_character_objects]
+    formable_team_indices = find_formable_team_indices(
+        match_index, match_index.roster_mask(valid_owned_ids), valid_owned_ids)
+    suggestions, seed_dependent = _build_suggestions(
+        match_index, owned_character_objects, formable_team_indices, seed)
+    _store_suggestions(cache_key, suggestions, seed_dependent, seed)
+    return suggestions
+
+
+def generate_teams_for_rosters(owned_character_id_sets, all_characters_info_list, seed=None, game_data=None):
+    """
+    Versão em lote de generate_teams_from_owned: recebe vários conjuntos de IDs
+    possuídos e devolve, na mesma ordem, a lista de sugestões de cada um. Todos os
+    rosters são casados contra os times em uma única passada (rosters x times);
+    rosters já presentes no cache de sugestões não são recalculados.
+    """
+    game_data = game_data or get_game_data()
+    cache_keys = [_suggestion_cache_key(game_data, owned_ids)
+                  for owned_ids in owned_character_id_sets]
+    suggestions_per_roster = [_get_cached_suggestions(cache_key, seed)
+                              for cache_key in cache_keys]
+    missing_positions = [pos for pos, suggestions in enumerate(suggestions_per_roster)
+                         if suggestions is None]
+    if not missing_positions:
+        return suggestions_per_roster
 
-    return suggested_teams_output
+    all_chars_map_with_builds = _characters_by_id(all_characters_info_list)
+    owned_objects_per_roster = [_owned_character_objects(owned_character_id_sets[pos], all_chars_map_with_builds)
+                                for pos in missing_positions]
+    match_index = get_team_match_index(game_data)
+    roster_masks = [match_index.roster_mask(char_obj["id"] for char_obj in owned_objects)
+                    for owned_objects in owned_objects_per_roster]
+    formable_per_roster = match_rosters_to_teams(match_index, roster_masks)
+    for pos, owned_objects, formable_team_indices in zip(missing_positions, owned_objects_per_roster, formable_per_roster):
+        suggestions, seed_dependent = _build_suggestions(
+            match_index, owned_objects, formable_team_indices, seed)
+        _store_suggestions(cache_keys[pos], suggestions, seed_dependent, seed)
+        suggestions_per_roster[pos] = suggestions
+    return suggestions_per_roster
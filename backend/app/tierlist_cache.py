@@ -0,0 +1,115 @@
+# backend/app/tierlist_cache.py
+# Cache em memória da tier list consolidada (tabela TierListEntry). A tabela só
+# muda quando o orquestrador roda, então cada processo guarda o corpo JSON já
+# serializado (com as variantes comprimidas e o ETag) e as notas por personagem,
+# e só os remonta quando a geração 'tierlist' de DataGeneration muda. A geração
+# é consultada no banco no máximo uma vez a cada TIER_LIST_GENERATION_TTL
+# segundos por processo.
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+from . import db
+from .data_loader import CatalogPayload, build_catalog_payload
+from .models import DataGeneration, TierListEntry
+
+TIER_LIST_GENERATION_NAME = 'tierlist'
+# Segundos em que a geração lida do banco é considerada atual; 0 consulta sempre
+TIER_LIST_GENERATION_TTL = float(os.getenv('TIER_LIST_GENERATION_TTL', '5'))
+
+
+@dataclass(frozen=True)
+class TierListCache:
+    generation: int
+    payload: CatalogPayload
+    # average_numeric_tier por character_id, usado no ranking das sugestões
+    scores_by_character: Dict[str, float]
+    # time.monotonic() da última consulta que confirmou 'generation'
+    checked_at: float = 0.0
+
+
+TIER_LIST_CACHE: Optional[TierListCache] = None
+_TIER_LIST_CACHE_LOCK = threading.Lock()
+
+
+def get_data_generation(name):
+    generation = db.session.execute(
+        db.select(DataGeneration.generation).where(DataGeneration.name == name)).scalar()
+    return generation or 0
+
+
+def bump_data_generation(name):
+    """
+    Incrementa a geração 'name' na sessão atual; o commit fica a cargo de quem
+    chama, na mesma transação que altera os dados.
+    """
+    result = db.session.execute(db.update(DataGeneration).where(DataGeneration.name == name)
+                                .values(generation=DataGeneration.generation + 1))
+    if result.rowcount == 0:
+        db.session.add(DataGeneration(name=name, generation=1))
+
+
+def bump_tier_list_generation():
+    bump_data_generation(TIER_LIST_GENERATION_NAME)
+
+
+def _tier_list_entry_to_dict(entry):
+    return {
+        "character_id": entry.character_id,
+        "character_name": entry.character_name,
+        "tier_level": entry.tier_level,
+        "role": entry.role,
+        "constellation": entry.constellation,
+        "rarity": entry.rarity,
+        "element": entry.element,
+        "average_numeric_tier": entry.average_numeric_tier,
+        "sources_contributing": entry.sources_contributing,
+        "original_scores_by_site": entry.original_scores_by_site
+    }
+
+
+def expire_tier_list_cache():
+    """
+    Força a próxima get_tier_list_cache a consultar a geração no banco. Chamada
+    depois do commit de uma nova tier list, para que o próprio processo não
+    espere o TIER_LIST_GENERATION_TTL; os demais a veem no próximo intervalo.
+    """
+    global TIER_LIST_CACHE
+    with _TIER_LIST_CACHE_LOCK:
+        if TIER_LIST_CACHE is not None:
+            TIER_LIST_CACHE = replace(TIER_LIST_CACHE, checked_at=0.0)
+
+
+def get_tier_list_cache():
+    """
+    Tier list da geração atual. Dentro de TIER_LIST_GENERATION_TTL não há nenhuma
+    consulta; depois, uma consulta de uma linha e, só quando a geração mudou, a
+    leitura da tabela e a serialização do corpo.
+    """
+    global TIER_LIST_CACHE
+    cache = TIER_LIST_CACHE
+    now = time.monotonic()
+    if cache is not None and cache.checked_at and now - cache.checked_at < TIER_LIST_GENERATION_TTL:
+        return cache
+    generation = get_data_generation(TIER_LIST_GENERATION_NAME)
+    with _TIER_LIST_CACHE_LOCK:
+        cache = TIER_LIST_CACHE
+        if cache is not None and cache.generation == generation:
+            if cache.checked_at < now:
+                cache = replace(cache, checked_at=now)
+                TIER_LIST_CACHE = cache
+            return cache
+        entries = db.session.execute(db.select(TierListEntry)).scalars().all()
+        cache = TierListCache(
+            generation=generation,
+            payload=build_catalog_payload(
+                [_tier_list_entry_to_dict(entry) for entry in entries]),
+            scores_by_character={entry.character_id: entry.average_numeric_tier for entry in entries
+                                 if entry.average_numeric_tier is not None},
+            checked_at=now)
+        TIER_LIST_CACHE = cache
+        print(
+            f"INFO: Cache da tier list montado para a geração {generation} ({len(entries)} itens).")
+        return cache
@@ -1,21 +1,27 @@
 # backend/app/tierlist_orchestrator.py
 import os
 import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import List, Dict, Any, Optional, Set, Union
 from collections import defaultdict
 import re
 
 from app import create_app, db
 from app.models import TierListEntry
+from app.tierlist_cache import bump_tier_list_generation, expire_tier_list_cache
 
-from app.data_loader import get_all_characters_map, load_all_character_data, load_all_artifacts_data, load_all_weapons_data
-from app.services.team_suggester import load_defined_compositions
+from app.data_loader import get_all_characters_map, load_all_game_data
 
+from app.scrapers.browser_pool import get_browser_pool
+from app.scrapers.fixtures import fetches_live_html
 from app.scrapers.genshin_gg_scraper import scrape_genshin_gg, GENSHIN_GG_URL
 from app.scrapers.game8_scraper import scrape_game8_co, GAME8_URL
 from app.scrapers.genshinlab_scraper import scrape_genshinlab_com, GENSHINLAB_URL
 
 TIER_LIST_JSON_OUTPUT_DIR = "scraped_tier_lists"
+# Tempo máximo (s) de espera por cada fonte; as fontes rodam em paralelo
+TIER_LIST_SCRAPER_TIMEOUT = float(os.getenv('TIER_LIST_SCRAPER_TIMEOUT', '120'))
 
 # --- MAPA DE ALIASES PARA CONSOLIDAR IDS DE PERSONAGENS DE SITES EXTERNOS ---
 # Chave: ID ou nome (limpo/padronizado) que vem do scraper.
@@ -306,15 +312,116 @@ SITE_SPECIFIC_TIER_MAPPINGS = {
 }
 
 
+def run_scrapers_in_parallel(scrapers_to_run: List[Dict[str, Any]],
+                             all_backend_characters_map: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Roda os scrapers em threads (o trabalho é quase todo espera de rede e do
+    navegador) e coleta o resultado de cada fonte assim que ela termina. O
+    'timeout' de cada fonte é repassado ao scraper, que limita por ele a
+    requisição ou o carregamento da página (descartando o navegador usado); uma
+    fonte que ainda assim passa do tempo é ignorada sem bloquear as demais.
+    Retorna {site_name: itens extraídos} só com as fontes que retornaram dados.
+    """
+    scraped_data_by_site: Dict[str, List[Dict[str, Any]]] = {}
+    executor = ThreadPoolExecutor(max_workers=len(scrapers_to_run),
+                                  thread_name_prefix="tierlist-scraper")
+    start_time = time.monotonic()
+    futures = {}
+    for scraper_info in scrapers_to_run:
+        print(
+            f"\nOrquestrador: Iniciando raspagem para {scraper_info['site_name']}...")
+        future = executor.submit(
+            scraper_info["scraper_func"], all_backend_characters_map, scraper_info["timeout"])
+        futures[future] = (scraper_info["site_name"],
+                           start_time + scraper_info["timeout"])
+
+    pending = set(futures)
+    try:
+        while pending:
+            next_deadline = min(futures[future][1] for future in pending)
+            done, pending = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                site_name = futures[future][0]
+                elapsed = time.monotonic() - start_time
+                try:
+                    scraped_data_from_site = future.result()
+                except Exception as e:
+                    print(
+                        f"Orquestrador: Erro na raspagem de {site_name} após {elapsed:.1f}s: {e}")
+                    continue
+                if scraped_data_from_site:
+                    print(
+                        f"Orquestrador: Raspagem de {site_name} concluída em {elapsed:.1f}s. {len(scraped_data_from_site)} itens extraídos.")
+                    scraped_data_by_site[site_name] = scraped_data_from_site
+                else:
+                    print(
+                        f"Orquestrador: Falha ou nenhum dado extraído de {site_name}.")
+
+            now = time.monotonic()
+            timed_out = {
+                future for future in pending if futures[future][1] <= now}
+            for future in timed_out:
+                print(
+                    f"Orquestrador: Tempo limite excedido na raspagem de {futures[future][0]}, ignorando esta fonte.")
+            pending -= timed_out
+    finally:
+        # Não espera pelas fontes que estouraram o tempo limite
+        executor.shutdown(wait=False, cancel_futures=True)
+    return scraped_data_by_site
+
+
+def replace_tier_list_entries(final_consolidated_tier_list: List[Dict[str, Any]]) -> None:
+    """
+    Troca todo o conteúdo de TierListEntry pela lista consolidada em uma única
+    transação (delete + insert em lote + nova geração do cache): quem lê vê a
+    tier list antiga ou a nova inteira, nunca uma parcial. Em caso de erro a
+    transação é desfeita e a tier list antiga continua valendo.
+    """
+    if not final_consolidated_tier_list:
+        print("Orquestrador: Tier list consolidada vazia. A tier list atual do banco foi mantida.")
+        return
+    entry_rows = [{
+        "character_id": entry_data["character_id"],
+        "character_name": entry_data["character_name"],
+        "tier_level": entry_data["tier_level"],
+        "role": entry_data["role"],
+        "constellation": entry_data.get("constellation", "C0"),
+        "rarity": entry_data["rarity"],
+        "element": entry_data["element"],
+        "average_numeric_tier": entry_data["average_numeric_tier"],
+        "sources_contributing": entry_data["sources_contributing"],
+        "original_scores_by_site_json": json.dumps(entry_data["original_scores_by_site"])
+        if entry_data["original_scores_by_site"] else "{}"
+    } for entry_data in final_consolidated_tier_list]
+
+    print("\nOrquestrador: Substituindo a tabela TierListEntry pelos dados consolidados...")
+    try:
+        db.session.execute(db.delete(TierListEntry))
+        db.session.execute(db.insert(TierListEntry), entry_rows)
+        # Invalida o cache da tier list de todos os processos na mesma transação
+        bump_tier_list_generation()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(
+            f"Orquestrador: ERRO ao salvar a tier list consolidada, a tier list anterior foi mantida: {e}")
+        raise
+    expire_tier_list_cache()
+    print(
+        f"Orquestrador: {len(entry_rows)} itens consolidados salvos na tabela TierListEntry.")
+
+
 def run_all_scrapers_and_consolidate() -> Dict[str, Any]: # type: ignore
     print("Orquestrador: Iniciando processo de raspagem e consolidação de Tier Lists...")
+    # Inicia os navegadores dos scrapers Selenium enquanto os dados são carregados
+    # (no modo replay nenhuma página é buscada e o Chrome nem é iniciado)
+    if fetches_live_html():
+        get_browser_pool().warm_up()
 
     # Carregar todos os dados de personagens do backend UMA VEZ
     print("Orquestrador: Carregando dados de personagens do backend para enriquecimento dos scrapers...")
-    load_all_character_data()
-    load_all_artifacts_data()
-    load_all_weapons_data()
-    load_defined_compositions()
+    load_all_game_data()
     all_backend_characters_map = get_all_characters_map()
     print("Orquestrador: Dados de personagens do backend carregados.")
 
@@ -323,42 +430,30 @@ def run_all_scrapers_and_consolidate() -> Dict[str, Any]: # type: ignore
     populate_character_aliases_from_backend_data(all_backend_characters_map)
     print("Orquestrador: Aliases populados.")
 
-    # Limpar o banco de dados da Tier List antes de raspar TUDO de novo
-    print("\nOrquestrador: Limpando a tabela TierListEntry no banco de dados...")
-    db.session.query(TierListEntry).delete()
-    db.session.commit()
-    print("Orquestrador: Tabela TierListEntry limpa.")
-
-    all_scraped_data_raw: List[Dict[str, Any]] = []
-
-    # --- Chamar cada scraper individualmente ---
+    # A tabela TierListEntry só é trocada no fim, com a lista já consolidada
+    # --- Rodar os scrapers em paralelo, cada um com seu tempo limite ---
     scrapers_to_run = [
         {"site_name": "genshin_gg", "url": GENSHIN_GG_URL,
-            "scraper_func": scrape_genshin_gg},
+            "scraper_func": scrape_genshin_gg, "timeout": TIER_LIST_SCRAPER_TIMEOUT},
         {"site_name": "game8_co", "url": GAME8_URL,
-            "scraper_func": scrape_game8_co},
+            "scraper_func": scrape_game8_co, "timeout": TIER_LIST_SCRAPER_TIMEOUT},
         {"site_name": "genshinlab_com", "url": GENSHINLAB_URL,
-            "scraper_func": scrape_genshinlab_com},
+            "scraper_func": scrape_genshinlab_com, "timeout": TIER_LIST_SCRAPER_TIMEOUT},
     ]
+    scraped_data_by_site = run_scrapers_in_parallel(
+        scrapers_to_run, all_backend_characters_map)
 
+    # Ordem fixa das fontes na consolidação, independente de quem terminou antes
+    all_scraped_data_raw: List[Dict[str, Any]] = []
     for scraper_info in scrapers_to_run:
-        site_name = scraper_info["site_name"]
-        site_url = scraper_info["url"]
-        scraper_func = scraper_info["scraper_func"]
-
-        print(f"\nOrquestrador: Iniciando raspagem para {site_name}...")
-        scraped_data_from_site = scraper_func(all_backend_characters_map)
-
-        if scraped_data_from_site:
-            print(
-                f"Orquestrador: Raspagem de {site_name} concluída. {len(scraped_data_from_site)} itens extraídos.")
-            all_scraped_data_raw.extend(scraped_data_from_site)
-        else:
-            print(
-                f"Orquestrador: Falha ou nenhum dado extraído de {site_name}.")
+        all_scraped_data_raw.extend(
+            scraped_data_by_site.get(scraper_info["site_name"]) or [])
 
     print(
         f"\nOrquestrador: Raspagem de todos os sites concluída. Total de itens brutos extraídos: {len(all_scraped_data_raw)}.")
+    if not all_scraped_data_raw:
+        print("Orquestrador: Nenhum dado raspado. A tier list atual do banco foi mantida.")
+        return
 
     # --- Salvar todos os dados brutos de todos os sites em um único JSON (para debug) ---
     if not os.path.exists(TIER_LIST_JSON_OUTPUT_DIR):
@@ -505,26 +600,7 @@ def run_all_scrapers_and_consolidate() -> Dict[str, Any]: # type: ignore
     print(
         f"Orquestrador: Tier list consolidada salva em {final_consolidated_output_path}")
 
-    print("\nOrquestrador: Limpando a tabela TierListEntry para inserir dados consolidados...")
-    db.session.query(TierListEntry).delete()
-    for entry_data in final_consolidated_tier_list:
-        entry = TierListEntry(
-            character_id=entry_data["character_id"],
-            character_name=entry_data["character_name"],
-            tier_level=entry_data["tier_level"],
-            role=entry_data["role"],
-            constellation=entry_data.get("constellation", "C0"),
-            rarity=entry_data["rarity"],
-            element=entry_data["element"],
-            average_numeric_tier=entry_data["average_numeric_tier"],
-            sources_contributing=entry_data["sources_contributing"],
-            original_scores_by_site=entry_data["original_scores_by_site"]
-        )
-        db.session.add(entry)
-    db.session.commit()
-    print(
-        f"Orquestrador: {len(final_consolidated_tier_list)} itens consolidados salvos na tabela TierListEntry.")
-
+    replace_tier_list_entries(final_consolidated_tier_list)
 
 if __name__ == "__main__":
     from app import create_app
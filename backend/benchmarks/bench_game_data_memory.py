@@ -0,0 +1,86 @@
+# backend/benchmarks/bench_game_data_memory.py
+"""
+Benchmark de memória dos dados do jogo com e sem compactação.
+
+Para cada modo (JSON com GAME_DATA_COMPACT=0 e =1, e o snapshot binário como foi
+gerado), carrega os dados em subprocessos limpos e mede o crescimento do RSS e,
+em uma execução separada, a memória alocada pelo Python (tracemalloc) que
+permanece viva após o carregamento. Os módulos são importados antes da medição.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_game_data_memory.py
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _current_rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def measure_current_process(trace):
+    """Executado no subprocesso: carrega os dados e imprime as medições em JSON."""
+    sys.path.insert(0, BACKEND_DIR)
+    from app import data_loader  # noqa: E402
+    from app.services import team_suggester  # noqa: E402,F401
+
+    gc.collect()
+    rss_before_kb = _current_rss_kb()
+    if trace:
+        tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        timings = data_loader.load_all_game_data()
+    gc.collect()
+    result = {"rss_growth_kb": _current_rss_kb() - rss_before_kb,
+              "load_ms": timings["total"]}
+    if trace:
+        result["traced_kb"] = tracemalloc.get_traced_memory()[0] // 1024
+        tracemalloc.stop()
+    print(json.dumps(result))
+
+
+def _run_child(source, compact, trace):
+    env = dict(os.environ, GAME_DATA_COMPACT=compact, GAME_DATA_SNAPSHOT=source)
+    command = [sys.executable, os.path.abspath(__file__), "--child"]
+    if trace:
+        command.append("--trace")
+    output = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        measure_current_process(args.trace)
+        return
+
+    print(f"{'modo':<26} {'RSS (KiB)':>10} {'tracemalloc (KiB)':>18} {'carga (ms)':>11}")
+    modes = (("json, sem compactação", "off", "0"),
+             ("json, compactado", "off", "1"),
+             ("snapshot (como gerado)", "auto", "1"))
+    for mode_name, source, compact in modes:
+        result = _run_child(source, compact, trace=False)
+        traced_result = _run_child(source, compact, trace=True)
+        print(f"{mode_name:<26} {result['rss_growth_kb']:>10} "
+              f"{traced_result['traced_kb']:>18} {result['load_ms']:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# backend/benchmarks/bench_scraper_parsing.py
+"""
+Benchmark do parsing das tier lists a partir do HTML gravado pelos scrapers.
+
+Lê as fixtures de SCRAPER_FIXTURES_DIR (gravadas com SCRAPER_FIXTURE_MODE=record)
+e mede, para cada fonte e cada backend de SCRAPER_HTML_PARSERS instalado, o tempo
+de parse_<site>(html, personagens) em várias repetições, sem rede nem navegador.
+Os registros de cada backend (com os SoupStrainer dos scrapers) precisam ser
+idênticos aos da referência: html.parser com a árvore inteira, sem strainer.
+Qualquer diferença encerra o benchmark com erro. Fontes sem fixture gravada são
+ignoradas.
+
+Uso (a partir de backend/):
+    SCRAPER_FIXTURE_MODE=record python -m app.tierlist_orchestrator  # uma vez, com rede
+    python benchmarks/bench_scraper_parsing.py [--repeat N]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app import data_loader  # noqa: E402
+from app.scrapers import fixtures, html_parsing  # noqa: E402
+from app.scrapers.game8_scraper import parse_game8_co  # noqa: E402
+from app.scrapers.genshin_gg_scraper import parse_genshin_gg  # noqa: E402
+from app.scrapers.genshinlab_scraper import parse_genshinlab_com  # noqa: E402
+
+PARSERS_BY_SITE = {
+    "genshin_gg": parse_genshin_gg,
+    "game8_co": parse_game8_co,
+    "genshinlab_com": parse_genshinlab_com,
+}
+
+
+def time_parser(parse_function, html, all_backend_characters_map, repeat):
+    timings_ms = []
+    records = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            records = parse_function(html, all_backend_characters_map)
+        timings_ms.append((time.perf_counter() - start_time) * 1000)
+    return records, timings_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="repetições por fonte (padrão: 5)")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        data_loader.load_all_game_data()
+    all_backend_characters_map = data_loader.get_all_characters_map()
+
+    html_parsers = [parser_name for parser_name in html_parsing.SCRAPER_HTML_PARSERS
+                    if parser_name != html_parsing.SCRAPER_HTML_PARSER_LXML or html_parsing.lxml is not None]
+    # Referência: html.parser sem strainer (árvore inteira)
+    parse_variants = [(html_parsing.SCRAPER_HTML_PARSER_BUILTIN, False)] + \
+        [(parser_name, True) for parser_name in html_parsers]
+
+    print(f"Fixtures em {fixtures.SCRAPER_FIXTURES_DIR}")
+    print(f"{'fonte':<16} {'backend':<12} {'strainer':>8} {'HTML (KiB)':>10} {'itens':>6} {'mín (ms)':>9} "
+          f"{'mediana (ms)':>13} {'idêntico':>9}")
+    mismatches = []
+    for site_name, parse_function in PARSERS_BY_SITE.items():
+        if not os.path.exists(fixtures.get_fixture_path(site_name)):
+            print(f"{site_name:<16} sem fixture gravada, ignorado")
+            continue
+        html = fixtures.read_fixture(site_name)
+        reference_records = None
+        for parser_name, use_strainer in parse_variants:
+            html_parsing.SCRAPER_HTML_PARSER = parser_name
+            html_parsing.SCRAPER_HTML_PARSE_ONLY = use_strainer
+            records, timings_ms = time_parser(
+                parse_function, html, all_backend_characters_map, args.repeat)
+            if reference_records is None:
+                reference_records = records
+            elif records != reference_records:
+                mismatches.append(f"{site_name}/{parser_name}")
+            print(f"{site_name:<16} {parser_name:<12} {'sim' if use_strainer else 'não':>8} "
+                  f"{len(html.encode('utf-8')) // 1024:>10} {len(records or []):>6} {min(timings_ms):>9.1f} "
+                  f"{statistics.median(timings_ms):>13.1f} {'sim' if records == reference_records else 'NÃO':>9}")
+
+    if mismatches:
+        print(f"FALHA: registros diferentes da referência sem strainer em: {', '.join(mismatches)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
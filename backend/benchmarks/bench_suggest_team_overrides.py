@@ -0,0 +1,90 @@
+# backend/benchmarks/bench_suggest_team_overrides.py
+"""
+Benchmark de regressão para /api/suggest-team com build_overrides.
+
+Injeta um build_overrides (notes_override + main_stats) no primeiro template
+carregado, chama a rota N vezes com o mesmo roster e mede, por janela de
+chamadas, a latência média e o tamanho da resposta: primeiro com o cache de
+sugestões desativado (frio, recalculando as sugestões a cada chamada) e depois
+com o roster já em cache (quente). Ambos devem permanecer
+estáveis: se a build compartilhada dos personagens carregados fosse alterada a cada
+requisição, o tamanho da resposta cresceria a cada chamada.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_suggest_team_overrides.py --calls 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.data_loader import get_character_build, get_game_data, replace_game_data  # noqa: E402
+from app.services import team_suggester  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--windows", type=int, default=10)
+    args = parser.parse_args()
+
+    app = create_app(enable_csrf=False)
+    client = app.test_client()
+
+    match_index = team_suggester.get_team_match_index()
+    template = match_index.compositions[0]
+    first_slot = template["characters_in_team"][0]
+    first_slot["build_overrides"] = {
+        "notes_override": "Benchmark de regressão",
+        "main_stats": {"sands": "Recarga de Energia (ER%)"},
+    }
+    replace_game_data(team_match_index=team_suggester.compile_team_match_index(
+        match_index.compositions, match_index.composition_files, get_game_data()))
+
+    base_build = get_character_build(
+        first_slot["character_id"], first_slot.get("build_key")) or {}
+    base_notes_len = len(base_build.get("notes_build") or "")
+    roster = [slot["character_id"] for slot in template["characters_in_team"]]
+
+    window_size = max(1, args.calls // args.windows)
+    cache_max_entries = team_suggester.SUGGESTION_CACHE_MAX_ENTRIES
+    print(f"Template: {template.get('id')} | roster: {roster}")
+    print(f"{'cache':>7} {'chamadas':>10} {'latência média (µs)':>20} {'tamanho (bytes)':>16}")
+    mean_latency_us = {}
+    # 'frio': cache de sugestões desativado, toda chamada recalcula as sugestões;
+    # 'quente': o roster já está no cache e só a resposta é montada
+    for cache_mode in ("frio", "quente"):
+        team_suggester.SUGGESTION_CACHE_MAX_ENTRIES = 0 if cache_mode == "frio" else cache_max_entries
+        if cache_mode == "quente":
+            client.post('/api/suggest-team', json={"owned_characters": roster})
+        done = 0
+        total_elapsed = 0.0
+        while done < args.calls:
+            calls_in_window = min(window_size, args.calls - done)
+            start = time.perf_counter()
+            for _ in range(calls_in_window):
+                response = client.post(
+                    '/api/suggest-team', json={"owned_characters": roster})
+            elapsed = time.perf_counter() - start
+            total_elapsed += elapsed
+            done += calls_in_window
+            print(
+                f"{cache_mode:>7} {done:>10} {elapsed / calls_in_window * 1e6:>20.1f} {len(response.data):>16}")
+        mean_latency_us[cache_mode] = total_elapsed / args.calls * 1e6
+    team_suggester.SUGGESTION_CACHE_MAX_ENTRIES = cache_max_entries
+    print("Latência média: " + ", ".join(
+        f"{cache_mode} {latency_us:.1f} µs" for cache_mode, latency_us in mean_latency_us.items()))
+
+    current_notes_len = len(base_build.get("notes_build") or "")
+    print(
+        f"notes_build da build base: {base_notes_len} -> {current_notes_len} caracteres")
+    if current_notes_len != base_notes_len:
+        print("FALHA: a build compartilhada foi alterada durante o benchmark.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
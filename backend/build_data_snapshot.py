@@ -0,0 +1,11 @@
+# backend/build_data_snapshot.py
+# Compila character_definitions/, game_data/ e services/team_data/ em um único
+# snapshot binário, carregado pelos workers no lugar dos arquivos JSON enquanto
+# estiver em dia com eles. Rodar novamente sempre que os dados forem alterados.
+import sys
+
+from app.data_loader import build_game_data_snapshot
+
+if __name__ == '__main__':
+    if not build_game_data_snapshot(sys.argv[1] if len(sys.argv) > 1 else None):
+        sys.exit(1)
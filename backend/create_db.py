@@ -4,6 +4,7 @@ from app import create_app  # Importa a função create_app diretamente de 'app'
 from app import db  # Importa o objeto 'db' do seu app/__init__.py
 # Importa os modelos User e OwnedCharacter
 from app.models import User, OwnedCharacter
+from app.roster_storage import ensure_packed_roster_column
 from werkzeug.security import generate_password_hash  # Para hash de senhas
 
 print("Iniciando script de criação e seed do banco de dados...")
@@ -35,6 +36,9 @@ with app.app_context():
     # Cria as tabelas no banco de dados, se não existirem
     db.create_all()
     print("Tabelas do banco de dados verificadas/criadas.")
+    # Bancos antigos: create_all não adiciona colunas novas a tabelas existentes
+    if ensure_packed_roster_column():
+        print("Coluna user.owned_characters_packed adicionada.")
 
     # Adicionar usuários padrão se o banco de dados estiver vazio (ou os usuários não existirem)
     if User.query.filter_by(username='admin').first() is None:
@@ -12,6 +12,12 @@ echo "Executando scraper da Tier List..."
 python app/tierlist_scraper.py
 echo "Scraper da Tier List concluído."
 
+# Recompila o snapshot dos dados do jogo: com o código montado como volume
+# (docker-compose), o snapshot gerado no build da imagem fica encoberto. Se
+# falhar, os workers leem os arquivos JSON.
+echo "Compilando o snapshot dos dados do jogo..."
+python build_data_snapshot.py || echo "AVISO: Snapshot dos dados do jogo não foi gerado. Os workers vão ler os arquivos JSON."
+
 # Inicia a aplicação principal (Gunicorn)
 echo "Iniciando Gunicorn..."
-exec gunicorn -b 0.0.0.0:5000 wsgi:app --log-level debug --access-logfile - --error-logfile -
\ No newline at end of file
+exec gunicorn -c gunicorn.conf.py wsgi:app --log-level debug --access-logfile - --error-logfile -
\ No newline at end of file
@@ -0,0 +1,44 @@
+# backend/gunicorn.conf.py
+# Configuração do Gunicorn. A aplicação (e todos os dados do jogo) é carregada
+# uma única vez no processo master e compartilhada com os workers via
+# copy-on-write após o fork.
+import gc
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+# Um worker por padrão; mais workers (e mais conexões/watchers) só via GUNICORN_WORKERS
+workers = int(os.getenv('GUNICORN_WORKERS', '1'))
+
+# Carrega wsgi:app no master, antes dos forks
+preload_app = True
+
+# Sem coletas durante o carregamento: evita que o GC espalhe os objetos
+# recém-criados por páginas que depois seriam copiadas em cada worker
+gc.disable()
+
+
+def when_ready(server):
+    # Move tudo o que foi carregado para a geração permanente do GC. Assim os
+    # workers nunca percorrem (nem escrevem nos cabeçalhos de) esses objetos e as
+    # páginas continuam compartilhadas.
+    gc.collect()
+    gc.freeze()
+    # O master continua vivo durante toda a execução: reativa o GC nele também
+    gc.enable()
+    server.log.info(
+        f"Dados do jogo congelados no master ({gc.get_freeze_count()} objetos).")
+
+
+def post_fork(server, worker):
+    # As conexões abertas pelo master não podem ser usadas pelos workers:
+    # descarta o pool herdado sem fechar os sockets do processo pai
+    from app import db
+    from wsgi import app
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+    gc.enable()
+
+    # O watcher de recarga dos dados roda em cada worker (threads não sobrevivem ao fork)
+    from app.data_loader import start_game_data_watcher
+    start_game_data_watcher()
@@ -0,0 +1,20 @@
+# backend/migrate_roster_storage.py
+# Migra os rosters dos usuários entre os modos de armazenamento (ver
+# app/roster_storage.py). Rodar antes de trocar ROSTER_STORAGE:
+#   python migrate_roster_storage.py packed   # OwnedCharacter -> User.owned_characters_packed
+#   python migrate_roster_storage.py rows     # User.owned_characters_packed -> OwnedCharacter
+import sys
+
+from app import create_app
+from app.roster_storage import ROSTER_STORAGE_MODES, migrate_roster_storage
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2 or sys.argv[1] not in ROSTER_STORAGE_MODES:
+        print(f"Uso: python migrate_roster_storage.py {{{'|'.join(ROSTER_STORAGE_MODES)}}}")
+        sys.exit(1)
+
+    app = create_app(enable_csrf=False)
+    with app.app_context():
+        migrated_users = migrate_roster_storage(sys.argv[1])
+        print(
+            f"INFO: Rosters de {migrated_users} usuários migrados para o modo '{sys.argv[1]}'.")
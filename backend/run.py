@@ -1,10 +1,13 @@
 # backend/run.py
 from app import create_app  # Importa a função de fábrica create_app
+from app.data_loader import start_game_data_watcher
 
 # Cria a instância da aplicação Flask.
 # Esta variável 'app' será usada pelo comando 'flask run' se você o executar diretamente.
 # Para Gunicorn, estamos usando o 'wsgi.py' como ponto de entrada.
 app = create_app()
+# Recarrega os arquivos de dados alterados sem reiniciar o servidor
+start_game_data_watcher()
 
 if __name__ == '__main__':
     # Quando o script é executado diretamente (ex: python run.py),
@@ -514,7 +514,12 @@ const CharacterProfilePage = () => {
                                     <div className="team-characters-profile">
                                         {team.characters_in_team?.map(member => (
                                             <div key={member.id} className="team-member-profile" title={`${member.name}\nFunção: ${member.role_in_team || 'N/A'}`}>
-                                                <img src={member.icon_url} alt={member.name} className="team-member-icon-small" />
+                                                {/* Slots flexíveis (member.flex) não têm personagem nem ícone */}
+                                                {member.icon_url ? (
+                                                    <img src={member.icon_url} alt={member.name} className="team-member-icon-small" />
+                                                ) : (
+                                                    <span className="team-member-icon-small">?</span>
+                                                )}
                                             </div>
                                         ))}
                                     </div>